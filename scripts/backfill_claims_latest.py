@@ -0,0 +1,69 @@
+"""
+Backfill the ClaimsLatest table from existing Claims versions.
+
+The decision agent keeps ClaimsLatest up to date for new decisions; run this
+once after creating the table so claims decided earlier appear in listings.
+"""
+
+import json
+import os
+import sys
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from shared.utils import claims_list_pk, to_dynamodb_value  # noqa: E402
+
+
+def main():
+    """Scan Claims, keep the newest version of each claim and write it to ClaimsLatest."""
+    dynamodb = boto3.resource("dynamodb")
+    claims_table = dynamodb.Table("Claims")
+    claims_latest_table = dynamodb.Table("ClaimsLatest")
+
+    latest = {}
+    scan_params = {
+        "ProjectionExpression": "claim_id, version, #st, #ts, decision_data, entities",
+        "ExpressionAttributeNames": {"#st": "status", "#ts": "timestamp"},
+    }
+
+    print("Scanning Claims...")
+    while True:
+        scan_response = claims_table.scan(**scan_params)
+
+        for item in scan_response.get("Items", []):
+            current = latest.get(item["claim_id"])
+            if current is None or item["version"] > current["version"]:
+                latest[item["claim_id"]] = item
+
+        if "LastEvaluatedKey" not in scan_response:
+            break
+        scan_params["ExclusiveStartKey"] = scan_response["LastEvaluatedKey"]
+
+    print(f"Writing {len(latest)} claims to ClaimsLatest...")
+    with claims_latest_table.batch_writer() as batch:
+        for item in latest.values():
+            decision_data = json.loads(item.get("decision_data", "{}"))
+            batch.put_item(
+                Item=to_dynamodb_value(
+                    {
+                        "claim_id": item["claim_id"],
+                        "list_pk": claims_list_pk(item["timestamp"]),
+                        "version": item["version"],
+                        "status": item["status"],
+                        "timestamp": item["timestamp"],
+                        "decision": decision_data.get("decision"),
+                        "reasoning": decision_data.get("reasoning"),
+                        "confidence": decision_data.get("confidence"),
+                        "estimated_payout": decision_data.get("estimated_payout"),
+                        "entities": json.loads(item.get("entities", "{}")),
+                    }
+                )
+            )
+
+    print("✅ ClaimsLatest backfill complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Compare end-to-end claim latency of the express pipeline and the Step Functions workflow.
+
+Each run processes the same raw-claims object under a fresh claim ID, once through
+claimvoyant-express (synchronous invoke) and once through ClaimvoyantWorkflow.
+
+Usage:
+    STATE_MACHINE_ARN=... python scripts/compare_pipeline_latency.py BUCKET KEY --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from shared.ids import new_claim_id  # noqa: E402
+
+
+def run_express(lambda_client, function_name, execution_input):
+    """Invoke the express pipeline and return its wall-clock latency in seconds."""
+    start = time.perf_counter()
+    result = lambda_client.invoke(
+        FunctionName=function_name,
+        InvocationType="RequestResponse",
+        Payload=json.dumps(execution_input),
+    )
+    elapsed = time.perf_counter() - start
+
+    payload = json.loads(result["Payload"].read())
+    if result.get("FunctionError") or payload.get("statusCode") != 200:
+        raise RuntimeError(f"Express pipeline failed: {payload}")
+    return elapsed
+
+
+def run_stepfunctions(stepfunctions, state_machine_arn, execution_input, poll_interval):
+    """Run the workflow to completion and return its execution duration in seconds."""
+    execution_arn = stepfunctions.start_execution(
+        stateMachineArn=state_machine_arn,
+        name=execution_input["claim_id"],
+        input=json.dumps(execution_input),
+    )["executionArn"]
+
+    while True:
+        execution = stepfunctions.describe_execution(executionArn=execution_arn)
+        if execution["status"] != "RUNNING":
+            break
+        time.sleep(poll_interval)
+
+    if execution["status"] != "SUCCEEDED":
+        raise RuntimeError(f"Execution {execution_arn} {execution['status']}")
+    return (execution["stopDate"] - execution["startDate"]).total_seconds()
+
+
+def summarize(name, latencies):
+    """Print mean, p50 and p95 latency for one pipeline."""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    print(
+        f"  {name:<14} mean {statistics.mean(ordered):6.2f}s  "
+        f"p50 {statistics.median(ordered):6.2f}s  p95 {p95:6.2f}s"
+    )
+
+
+def main():
+    """Parse arguments, run both pipelines and print their latency."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("bucket", help="Raw-claims bucket holding the sample object")
+    parser.add_argument("key", help="Key of the sample claim document or photo")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per pipeline (default: 5)")
+    parser.add_argument(
+        "--express-function",
+        default=os.getenv("EXPRESS_FUNCTION_NAME", "claimvoyant-express"),
+        help="Express pipeline function name (default: claimvoyant-express)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between Step Functions status checks (default: 0.5)",
+    )
+    args = parser.parse_args()
+
+    state_machine_arn = os.getenv("STATE_MACHINE_ARN")
+    if not state_machine_arn:
+        parser.error("STATE_MACHINE_ARN must be set")
+
+    lambda_client = boto3.client("lambda")
+    stepfunctions = boto3.client("stepfunctions")
+
+    latencies = {"express": [], "stepfunctions": []}
+    for run in range(1, args.runs + 1):
+        execution_input = {"bucket": args.bucket, "key": args.key}
+
+        express = run_express(
+            lambda_client, args.express_function, {**execution_input, "claim_id": new_claim_id()}
+        )
+        workflow = run_stepfunctions(
+            stepfunctions,
+            state_machine_arn,
+            {**execution_input, "claim_id": new_claim_id()},
+            args.poll_interval,
+        )
+        latencies["express"].append(express)
+        latencies["stepfunctions"].append(workflow)
+        print(f"Run {run}: express {express:.2f}s, stepfunctions {workflow:.2f}s")
+
+    print(f"\nLatency over {args.runs} runs:")
+    for name, values in latencies.items():
+        summarize(name, values)
+
+
+if __name__ == "__main__":
+    main()
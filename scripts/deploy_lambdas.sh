@@ -15,11 +15,38 @@ else
     exit 1
 fi
 
+# Step Functions workflow started by the API and upload trigger
+STATE_MACHINE_ARN=${STATE_MACHINE_ARN:-"arn:aws:states:${AWS_REGION}:${AWS_ACCOUNT_ID}:stateMachine:ClaimvoyantWorkflow"}
+
 echo "AWS Account: ${AWS_ACCOUNT_ID}"
 echo "Region: ${AWS_REGION}"
 echo "Lambda Role ARN: ${LAMBDA_ROLE_ARN}"
+echo "State Machine ARN: ${STATE_MACHINE_ARN}"
 echo ""
 
+# Environment shared by all functions
+LAMBDA_ENV="BUCKET_PREFIX=${BUCKET_PREFIX}"
+LAMBDA_ENV="${LAMBDA_ENV},STATE_MACHINE_ARN=${STATE_MACHINE_ARN}"
+LAMBDA_ENV="${LAMBDA_ENV},DEFAULT_PIPELINE=${DEFAULT_PIPELINE:-stepfunctions}"
+LAMBDA_ENV="${LAMBDA_ENV},EXPRESS_FUNCTION_NAME=claimvoyant-express"
+
+# Async Textract jobs notify claimvoyant-intake-textract when SNS is set up
+if [ -n "${TEXTRACT_SNS_TOPIC_ARN}" ] && [ -n "${TEXTRACT_SNS_ROLE_ARN}" ]; then
+    LAMBDA_ENV="${LAMBDA_ENV},TEXTRACT_COMPLETION_MODE=sns"
+    LAMBDA_ENV="${LAMBDA_ENV},TEXTRACT_SNS_TOPIC_ARN=${TEXTRACT_SNS_TOPIC_ARN}"
+    LAMBDA_ENV="${LAMBDA_ENV},TEXTRACT_SNS_ROLE_ARN=${TEXTRACT_SNS_ROLE_ARN}"
+fi
+
+# Agents queue AuditLog entries for claimvoyant-audit instead of writing them inline
+if [ -n "${AUDIT_LOG_QUEUE_URL}" ]; then
+    LAMBDA_ENV="${LAMBDA_ENV},AUDIT_LOG_QUEUE_URL=${AUDIT_LOG_QUEUE_URL}"
+fi
+
+# Policy agent containers share lookups through the PolicyCache table
+if [ -n "${POLICY_CACHE_TABLE}" ]; then
+    LAMBDA_ENV="${LAMBDA_ENV},POLICY_CACHE_TABLE=${POLICY_CACHE_TABLE}"
+fi
+
 # Colors
 GREEN='\033[0;32m'
 YELLOW='\033[1;33m'
@@ -32,6 +59,7 @@ deploy_lambda() {
     local HANDLER=${3:-lambda_function.lambda_handler}
     local TIMEOUT=${4:-120}
     local MEMORY=${5:-512}
+    local INCLUDE_AGENTS=${6:-false}
 
     echo "${GREEN}Deploying ${FUNCTION_NAME}...${NC}"
 
@@ -51,6 +79,17 @@ deploy_lambda() {
         zip -qr "${CURRENT_DIR}/${FUNCTION_DIR}/function.zip" shared/
     fi
 
+    # Add agent modules for functions that run the workflow in-process (shared.pipeline)
+    if [ "${INCLUDE_AGENTS}" = "true" ]; then
+        cd "${CURRENT_DIR}/src"
+        zip -q "${CURRENT_DIR}/${FUNCTION_DIR}/function.zip" \
+            functions/intake/lambda_function.py \
+            functions/policy/lambda_function.py \
+            functions/damage/lambda_function.py \
+            functions/valuation/lambda_function.py \
+            functions/decision/lambda_function.py
+    fi
+
     # Add dependencies from virtual environment
     if [ -d "${CURRENT_DIR}/venv/lib/python3.13/site-packages" ]; then
         cd "${CURRENT_DIR}/venv/lib/python3.13/site-packages"
@@ -86,7 +125,7 @@ deploy_lambda() {
             --function-name "${FUNCTION_NAME}" \
             --timeout "${TIMEOUT}" \
             --memory-size "${MEMORY}" \
-            --environment "Variables={BUCKET_PREFIX=${BUCKET_PREFIX}}" \
+            --environment "Variables={${LAMBDA_ENV}}" \
             --region "${AWS_REGION}" > /dev/null
 
         echo "  ✓ Function updated"
@@ -100,7 +139,7 @@ deploy_lambda() {
             --zip-file fileb://function.zip \
             --timeout "${TIMEOUT}" \
             --memory-size "${MEMORY}" \
-            --environment "Variables={BUCKET_PREFIX=${BUCKET_PREFIX}}" \
+            --environment "Variables={${LAMBDA_ENV}}" \
             --region "${AWS_REGION}" > /dev/null
 
         echo "  ✓ Function created"
@@ -122,11 +161,71 @@ echo "Starting Lambda deployment..."
 echo ""
 
 deploy_lambda "claimvoyant-intake" "src/functions/intake" "lambda_function.lambda_handler" 180 1024
+deploy_lambda "claimvoyant-intake-textract" "src/functions/intake" "lambda_function.textract_completion_handler" 180 1024
 deploy_lambda "claimvoyant-policy" "src/functions/policy" "lambda_function.lambda_handler" 60 512
 deploy_lambda "claimvoyant-damage" "src/functions/damage" "lambda_function.lambda_handler" 60 512
 deploy_lambda "claimvoyant-valuation" "src/functions/valuation" "lambda_function.lambda_handler" 60 512
 deploy_lambda "claimvoyant-decision" "src/functions/decision" "lambda_function.lambda_handler" 120 1024
+deploy_lambda "claimvoyant-express" "src/functions/express" "lambda_function.lambda_handler" 300 1024 true
+deploy_lambda "claimvoyant-audit" "src/functions/audit" "lambda_function.lambda_handler" 60 256
 deploy_lambda "claimvoyant-api" "src/functions/api" "lambda_function_simple.handler" 30 512
+deploy_lambda "claimvoyant-upload-trigger" "src/functions/api" "lambda_function_simple.object_created_handler" 30 256
+
+# Express runs are async invokes: retry failures, then keep the event for redrive
+if [ -n "${EXPRESS_FAILURE_QUEUE_ARN}" ]; then
+    aws lambda put-function-event-invoke-config \
+        --function-name claimvoyant-express \
+        --maximum-retry-attempts 2 \
+        --destination-config "OnFailure={Destination=${EXPRESS_FAILURE_QUEUE_ARN}}" \
+        --region "${AWS_REGION}" > /dev/null
+
+    echo "  ✓ claimvoyant-express failures sent to ${EXPRESS_FAILURE_QUEUE_ARN}"
+    echo ""
+fi
+
+# Drain the audit queue into the AuditLog table, retrying only the failed messages
+if [ -n "${AUDIT_LOG_QUEUE_ARN}" ]; then
+    AUDIT_MAPPINGS=$(aws lambda list-event-source-mappings \
+        --function-name claimvoyant-audit \
+        --event-source-arn "${AUDIT_LOG_QUEUE_ARN}" \
+        --region "${AWS_REGION}" \
+        --query 'length(EventSourceMappings)' --output text)
+
+    if [ "${AUDIT_MAPPINGS}" = "0" ]; then
+        aws lambda create-event-source-mapping \
+            --function-name claimvoyant-audit \
+            --event-source-arn "${AUDIT_LOG_QUEUE_ARN}" \
+            --batch-size 100 \
+            --maximum-batching-window-in-seconds 5 \
+            --function-response-types ReportBatchItemFailures \
+            --region "${AWS_REGION}" > /dev/null
+    fi
+
+    echo "  ✓ claimvoyant-audit draining ${AUDIT_LOG_QUEUE_ARN}"
+    echo ""
+fi
+
+# Deliver Textract completion notifications to claimvoyant-intake-textract
+if [ -n "${TEXTRACT_SNS_TOPIC_ARN}" ]; then
+    TEXTRACT_HANDLER_ARN="arn:aws:lambda:${AWS_REGION}:${AWS_ACCOUNT_ID}:function:claimvoyant-intake-textract"
+
+    aws lambda add-permission \
+        --function-name claimvoyant-intake-textract \
+        --statement-id textract-completion-sns \
+        --action lambda:InvokeFunction \
+        --principal sns.amazonaws.com \
+        --source-arn "${TEXTRACT_SNS_TOPIC_ARN}" \
+        --region "${AWS_REGION}" > /dev/null 2>&1 || true
+
+    aws sns subscribe \
+        --topic-arn "${TEXTRACT_SNS_TOPIC_ARN}" \
+        --protocol lambda \
+        --notification-endpoint "${TEXTRACT_HANDLER_ARN}" \
+        --region "${AWS_REGION}" > /dev/null
+
+    echo "  ✓ claimvoyant-intake-textract subscribed to Textract completions"
+    echo ""
+fi
 
 echo "${GREEN}========================================"
 echo "Lambda Deployment Complete!"
@@ -134,13 +233,17 @@ echo "========================================${NC}"
 echo ""
 echo "Deployed functions:"
 echo "  ✓ claimvoyant-intake (180s timeout, 1024MB)"
+echo "  ✓ claimvoyant-intake-textract (180s timeout, 1024MB)"
 echo "  ✓ claimvoyant-policy (60s timeout, 512MB)"
 echo "  ✓ claimvoyant-damage (60s timeout, 512MB)"
 echo "  ✓ claimvoyant-valuation (60s timeout, 512MB)"
 echo "  ✓ claimvoyant-decision (120s timeout, 1024MB)"
+echo "  ✓ claimvoyant-express (300s timeout, 1024MB)"
+echo "  ✓ claimvoyant-audit (60s timeout, 256MB)"
 echo "  ✓ claimvoyant-api (30s timeout, 512MB)"
+echo "  ✓ claimvoyant-upload-trigger (30s timeout, 256MB)"
 echo ""
 echo "Next steps:"
 echo "  1. Create Step Functions state machine"
 echo "  2. Deploy API Gateway"
-echo "  3. Configure EventBridge trigger"
+echo "  3. Configure EventBridge trigger (raw-claims Object Created -> claimvoyant-upload-trigger)"
@@ -6,11 +6,16 @@ Run this script after setting up Weaviate Cloud cluster.
 
 import json
 import os
+import sys
 
 import weaviate
-from weaviate.classes.config import Configure, DataType, Property
+from weaviate.classes.config import Configure, DataType, Property, Tokenization
 from weaviate.classes.init import Auth
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from shared.clients import batch_insert  # noqa: E402
+
 
 def create_collections(client):
     """Create Weaviate collections for Claimvoyant."""
@@ -26,7 +31,13 @@ def create_collections(client):
             model="anthropic.claude-3-5-sonnet-20241022-v2:0", region="us-east-1"
         ),
         properties=[
-            Property(name="policy_id", data_type=DataType.TEXT, skip_vectorization=True),
+            # Field tokenization so policy_id filters match the whole identifier
+            Property(
+                name="policy_id",
+                data_type=DataType.TEXT,
+                skip_vectorization=True,
+                tokenization=Tokenization.FIELD,
+            ),
             Property(name="content", data_type=DataType.TEXT),
             Property(name="coverage_type", data_type=DataType.TEXT),
             Property(name="deductible", data_type=DataType.NUMBER, skip_vectorization=True),
@@ -128,11 +139,14 @@ def load_sample_policies(client):
         },
     ]
 
+    result = batch_insert(policies, sample_policies)
+
     for policy in sample_policies:
-        policies.data.insert(properties=policy)
-        print(f"  ✓ Loaded policy: {policy['policy_id']}")
+        print(f"  ✓ Queued policy: {policy['policy_id']}")
 
-    print(f"\n{len(sample_policies)} sample policies loaded successfully!")
+    print(f"\n{result['inserted']} sample policies loaded successfully!")
+    if result["failed"]:
+        print(f"⚠️  {result['failed']} policies failed to load")
 
 
 def main():
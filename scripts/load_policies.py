@@ -0,0 +1,97 @@
+"""
+Bulk-load policy documents into the Weaviate PolicyDocuments collection from a JSONL file.
+
+Each line must be a JSON object with the PolicyDocuments properties
+(policy_id, content, coverage_type, deductible, coverage_limit, filing_deadline_days).
+
+Usage:
+    WEAVIATE_URL=... WEAVIATE_API_KEY=... python scripts/load_policies.py policies.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import weaviate
+from weaviate.classes.init import Auth
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from shared.clients import batch_insert  # noqa: E402
+
+
+def read_policies(path):
+    """Yield policy property dictionaries from a JSONL file, skipping blank lines."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e})") from e
+
+
+def main():
+    """Parse arguments and bulk-load the policies."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("path", help="JSONL file with one policy per line")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Fixed batch size (default: dynamic sizing based on server load)",
+    )
+    parser.add_argument(
+        "--concurrent-requests",
+        type=int,
+        default=2,
+        help="Parallel batch requests when --batch-size is set (default: 2)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=2,
+        help="Times failed objects are re-submitted (default: 2)",
+    )
+    args = parser.parse_args()
+
+    weaviate_url = os.getenv("WEAVIATE_URL")
+    weaviate_api_key = os.getenv("WEAVIATE_API_KEY")
+    if not weaviate_url or not weaviate_api_key:
+        parser.error("WEAVIATE_URL and WEAVIATE_API_KEY must be set")
+
+    print(f"Connecting to Weaviate: {weaviate_url}")
+
+    client = weaviate.connect_to_weaviate_cloud(
+        cluster_url=weaviate_url, auth_credentials=Auth.api_key(weaviate_api_key)
+    )
+
+    try:
+        policies = client.collections.get("PolicyDocuments")
+
+        start = time.perf_counter()
+        result = batch_insert(
+            policies,
+            read_policies(args.path),
+            batch_size=args.batch_size,
+            concurrent_requests=args.concurrent_requests,
+            max_retries=args.max_retries,
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        client.close()
+
+    print(f"\n✅ Loaded {result['inserted']} policies in {elapsed:.1f}s")
+
+    if result["failed"]:
+        print(f"⚠️  {result['failed']} policies failed after {args.max_retries} retries")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
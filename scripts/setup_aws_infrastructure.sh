@@ -62,6 +62,59 @@ for bucket in raw-claims processed reports policies; do
     fi
 done
 
+# Claim-context objects only live for the workflow run (and re-drives); expire them,
+# including the noncurrent versions kept by bucket versioning
+CLAIM_CONTEXT_RETENTION_DAYS=${CLAIM_CONTEXT_RETENTION_DAYS:-30}
+aws s3api put-bucket-lifecycle-configuration \
+    --bucket "${BUCKET_PREFIX}-processed" \
+    --lifecycle-configuration '{
+        "Rules": [{
+            "ID": "expire-claim-context",
+            "Filter": {"Prefix": "claim-context/"},
+            "Status": "Enabled",
+            "Expiration": {"Days": '"${CLAIM_CONTEXT_RETENTION_DAYS}"'},
+            "NoncurrentVersionExpiration": {"NoncurrentDays": 1}
+        }, {
+            "ID": "remove-expired-delete-markers",
+            "Filter": {"Prefix": "claim-context/"},
+            "Status": "Enabled",
+            "Expiration": {"ExpiredObjectDeleteMarker": true}
+        }]
+    }'
+echo "  ✓ claim-context/ in ${BUCKET_PREFIX}-processed expires after ${CLAIM_CONTEXT_RETENTION_DAYS} days"
+
+# Raw claims are uploaded from the browser with presigned URLs and
+# object-created events are published to EventBridge to start the workflow
+aws s3api put-bucket-cors \
+    --bucket "${BUCKET_PREFIX}-raw-claims" \
+    --cors-configuration '{
+        "CORSRules": [{
+            "AllowedOrigins": ["*"],
+            "AllowedMethods": ["PUT", "POST"],
+            "AllowedHeaders": ["*"],
+            "ExposeHeaders": ["ETag"],
+            "MaxAgeSeconds": 3000
+        }]
+    }'
+
+aws s3api put-bucket-notification-configuration \
+    --bucket "${BUCKET_PREFIX}-raw-claims" \
+    --notification-configuration '{"EventBridgeConfiguration": {}}'
+
+# Abandoned multipart uploads keep their (billed) parts until aborted
+aws s3api put-bucket-lifecycle-configuration \
+    --bucket "${BUCKET_PREFIX}-raw-claims" \
+    --lifecycle-configuration '{
+        "Rules": [{
+            "ID": "abort-incomplete-multipart-uploads",
+            "Filter": {},
+            "Status": "Enabled",
+            "AbortIncompleteMultipartUpload": {"DaysAfterInitiation": 1}
+        }]
+    }'
+
+echo "  ✓ Bucket ${BUCKET_PREFIX}-raw-claims configured for direct uploads and EventBridge events"
+
 echo ""
 
 # Phase 2: Create DynamoDB Tables
@@ -96,6 +149,83 @@ else
     echo "  ✓ Claims table created with PITR enabled"
 fi
 
+# Create ClaimsLatest table (latest version per claim, listed newest-first via GSI)
+if aws dynamodb describe-table --table-name ClaimsLatest --region "${AWS_REGION}" 2>/dev/null; then
+    echo "  ✓ ClaimsLatest table already exists"
+
+    # Tables created before status filtering lack the LatestByStatus index
+    LATEST_BY_STATUS=$(aws dynamodb describe-table \
+        --table-name ClaimsLatest \
+        --region "${AWS_REGION}" \
+        --query "length(Table.GlobalSecondaryIndexes[?IndexName=='LatestByStatus'])" \
+        --output text)
+
+    if [ "${LATEST_BY_STATUS}" = "0" ]; then
+        echo "  Adding LatestByStatus index to ClaimsLatest..."
+        aws dynamodb update-table \
+            --table-name ClaimsLatest \
+            --attribute-definitions \
+                AttributeName=status,AttributeType=S \
+                AttributeName=timestamp,AttributeType=S \
+            --global-secondary-index-updates '[{
+                "Create": {
+                    "IndexName": "LatestByStatus",
+                    "KeySchema": [
+                        {"AttributeName": "status", "KeyType": "HASH"},
+                        {"AttributeName": "timestamp", "KeyType": "RANGE"}
+                    ],
+                    "Projection": {"ProjectionType": "ALL"}
+                }
+            }]' \
+            --region "${AWS_REGION}" > /dev/null
+
+        # Wait for the index to finish backfilling
+        while [ "$(aws dynamodb describe-table \
+            --table-name ClaimsLatest \
+            --region "${AWS_REGION}" \
+            --query "Table.GlobalSecondaryIndexes[?IndexName=='LatestByStatus'].IndexStatus | [0]" \
+            --output text)" != "ACTIVE" ]; do
+            sleep 10
+        done
+
+        echo "  ✓ LatestByStatus index added to ClaimsLatest"
+    fi
+else
+    echo "  Creating ClaimsLatest table..."
+    aws dynamodb create-table \
+        --table-name ClaimsLatest \
+        --attribute-definitions \
+            AttributeName=claim_id,AttributeType=S \
+            AttributeName=list_pk,AttributeType=S \
+            AttributeName=timestamp,AttributeType=S \
+            AttributeName=status,AttributeType=S \
+        --key-schema \
+            AttributeName=claim_id,KeyType=HASH \
+        --global-secondary-indexes '[{
+            "IndexName": "LatestByTimestamp",
+            "KeySchema": [
+                {"AttributeName": "list_pk", "KeyType": "HASH"},
+                {"AttributeName": "timestamp", "KeyType": "RANGE"}
+            ],
+            "Projection": {"ProjectionType": "ALL"}
+        }, {
+            "IndexName": "LatestByStatus",
+            "KeySchema": [
+                {"AttributeName": "status", "KeyType": "HASH"},
+                {"AttributeName": "timestamp", "KeyType": "RANGE"}
+            ],
+            "Projection": {"ProjectionType": "ALL"}
+        }]' \
+        --billing-mode PAY_PER_REQUEST \
+        --tags Key=Project,Value=Claimvoyant Key=Environment,Value=Production \
+        --region "${AWS_REGION}" > /dev/null
+
+    # Wait for table to be active
+    aws dynamodb wait table-exists --table-name ClaimsLatest --region "${AWS_REGION}"
+
+    echo "  ✓ ClaimsLatest table created with LatestByTimestamp and LatestByStatus indexes"
+fi
+
 # Create AuditLog table
 if aws dynamodb describe-table --table-name AuditLog --region "${AWS_REGION}" 2>/dev/null; then
     echo "  ✓ AuditLog table already exists"
@@ -125,6 +255,115 @@ else
     echo "  ✓ AuditLog table created with PITR enabled"
 fi
 
+# Create DecisionCache table (content-addressed Bedrock decisions, expired via TTL)
+if aws dynamodb describe-table --table-name DecisionCache --region "${AWS_REGION}" 2>/dev/null; then
+    echo "  ✓ DecisionCache table already exists"
+else
+    echo "  Creating DecisionCache table..."
+    aws dynamodb create-table \
+        --table-name DecisionCache \
+        --attribute-definitions \
+            AttributeName=cache_key,AttributeType=S \
+        --key-schema \
+            AttributeName=cache_key,KeyType=HASH \
+        --billing-mode PAY_PER_REQUEST \
+        --tags Key=Project,Value=Claimvoyant Key=Environment,Value=Production \
+        --region "${AWS_REGION}" > /dev/null
+
+    # Wait for table to be active
+    aws dynamodb wait table-exists --table-name DecisionCache --region "${AWS_REGION}"
+
+    # Expire cached decisions
+    aws dynamodb update-time-to-live \
+        --table-name DecisionCache \
+        --time-to-live-specification Enabled=true,AttributeName=expires_at \
+        --region "${AWS_REGION}" > /dev/null
+
+    echo "  ✓ DecisionCache table created with TTL enabled"
+fi
+
+# Create PipelineStarts table (conditional-put markers deduplicating express pipeline starts)
+if aws dynamodb describe-table --table-name PipelineStarts --region "${AWS_REGION}" 2>/dev/null; then
+    echo "  ✓ PipelineStarts table already exists"
+else
+    echo "  Creating PipelineStarts table..."
+    aws dynamodb create-table \
+        --table-name PipelineStarts \
+        --attribute-definitions \
+            AttributeName=execution_name,AttributeType=S \
+        --key-schema \
+            AttributeName=execution_name,KeyType=HASH \
+        --billing-mode PAY_PER_REQUEST \
+        --tags Key=Project,Value=Claimvoyant Key=Environment,Value=Production \
+        --region "${AWS_REGION}" > /dev/null
+
+    # Wait for table to be active
+    aws dynamodb wait table-exists --table-name PipelineStarts --region "${AWS_REGION}"
+
+    # Expire start markers
+    aws dynamodb update-time-to-live \
+        --table-name PipelineStarts \
+        --time-to-live-specification Enabled=true,AttributeName=expires_at \
+        --region "${AWS_REGION}" > /dev/null
+
+    echo "  ✓ PipelineStarts table created with TTL enabled"
+fi
+
+# Create PolicyCache table (policy lookups shared by warm policy agent containers)
+if aws dynamodb describe-table --table-name PolicyCache --region "${AWS_REGION}" 2>/dev/null; then
+    echo "  ✓ PolicyCache table already exists"
+else
+    echo "  Creating PolicyCache table..."
+    aws dynamodb create-table \
+        --table-name PolicyCache \
+        --attribute-definitions \
+            AttributeName=policy_number,AttributeType=S \
+        --key-schema \
+            AttributeName=policy_number,KeyType=HASH \
+        --billing-mode PAY_PER_REQUEST \
+        --tags Key=Project,Value=Claimvoyant Key=Environment,Value=Production \
+        --region "${AWS_REGION}" > /dev/null
+
+    # Wait for table to be active
+    aws dynamodb wait table-exists --table-name PolicyCache --region "${AWS_REGION}"
+
+    # Expire cached policies
+    aws dynamodb update-time-to-live \
+        --table-name PolicyCache \
+        --time-to-live-specification Enabled=true,AttributeName=expires_at \
+        --region "${AWS_REGION}" > /dev/null
+
+    echo "  ✓ PolicyCache table created with TTL enabled"
+fi
+
+# Create the audit queue: agents send AuditLog entries here and claimvoyant-audit
+# batch-writes them to the AuditLog table (visibility timeout covers its 60s timeout)
+AUDIT_LOG_QUEUE_URL=$(aws sqs create-queue \
+    --queue-name claimvoyant-audit-log \
+    --attributes VisibilityTimeout=120,MessageRetentionPeriod=1209600 \
+    --region "${AWS_REGION}" \
+    --query QueueUrl --output text)
+AUDIT_LOG_QUEUE_ARN=$(aws sqs get-queue-attributes \
+    --queue-url "${AUDIT_LOG_QUEUE_URL}" \
+    --attribute-names QueueArn \
+    --region "${AWS_REGION}" \
+    --query Attributes.QueueArn --output text)
+echo "  ✓ Audit log queue: ${AUDIT_LOG_QUEUE_URL}"
+
+# Create the express failure queue: claimvoyant-express events that fail every async
+# retry land here for inspection and redrive
+EXPRESS_FAILURE_QUEUE_URL=$(aws sqs create-queue \
+    --queue-name claimvoyant-express-failures \
+    --attributes MessageRetentionPeriod=1209600 \
+    --region "${AWS_REGION}" \
+    --query QueueUrl --output text)
+EXPRESS_FAILURE_QUEUE_ARN=$(aws sqs get-queue-attributes \
+    --queue-url "${EXPRESS_FAILURE_QUEUE_URL}" \
+    --attribute-names QueueArn \
+    --region "${AWS_REGION}" \
+    --query Attributes.QueueArn --output text)
+echo "  ✓ Express failure queue: ${EXPRESS_FAILURE_QUEUE_URL}"
+
 echo ""
 
 # Phase 3: Weaviate Cloud Setup (Manual)
@@ -168,6 +407,67 @@ echo ""
 # Phase 5: Create IAM Roles
 echo "${GREEN}Phase 5: Creating IAM Roles...${NC}"
 
+# Textract completion notifications: async PDF jobs publish to this topic, and
+# claimvoyant-intake-textract resumes the waiting workflow
+TEXTRACT_SNS_TOPIC_ARN=$(aws sns create-topic \
+    --name claimvoyant-textract-completion \
+    --region "${AWS_REGION}" \
+    --query TopicArn --output text)
+echo "  ✓ Textract completion topic: ${TEXTRACT_SNS_TOPIC_ARN}"
+
+# Role Textract assumes to publish job completion to the topic
+TEXTRACT_ROLE_NAME="ClaimvoyantTextractPublishRole"
+
+if aws iam get-role --role-name "${TEXTRACT_ROLE_NAME}" 2>/dev/null; then
+    echo "  ✓ Textract publish role already exists"
+else
+    echo "  Creating Textract publish role..."
+
+    cat > /tmp/textract-trust-policy.json <<EOF
+{
+  "Version": "2012-10-17",
+  "Statement": [
+    {
+      "Effect": "Allow",
+      "Principal": {
+        "Service": "textract.amazonaws.com"
+      },
+      "Action": "sts:AssumeRole"
+    }
+  ]
+}
+EOF
+
+    aws iam create-role \
+        --role-name "${TEXTRACT_ROLE_NAME}" \
+        --assume-role-policy-document file:///tmp/textract-trust-policy.json \
+        --description "Lets Textract publish Claimvoyant job completions" > /dev/null
+
+    cat > /tmp/textract-policy.json <<EOF
+{
+  "Version": "2012-10-17",
+  "Statement": [
+    {
+      "Effect": "Allow",
+      "Action": [
+        "sns:Publish"
+      ],
+      "Resource": "${TEXTRACT_SNS_TOPIC_ARN}"
+    }
+  ]
+}
+EOF
+
+    aws iam put-role-policy \
+        --role-name "${TEXTRACT_ROLE_NAME}" \
+        --policy-name ClaimvoyantTextractPublishPolicy \
+        --policy-document file:///tmp/textract-policy.json
+
+    echo "  ✓ Textract publish role created"
+fi
+
+TEXTRACT_SNS_ROLE_ARN="arn:aws:iam::${AWS_ACCOUNT_ID}:role/${TEXTRACT_ROLE_NAME}"
+
 # Lambda Execution Role
 LAMBDA_ROLE_NAME="ClaimvoyantLambdaExecutionRole"
 
@@ -197,8 +497,11 @@ EOF
         --assume-role-policy-document file:///tmp/lambda-trust-policy.json \
         --description "Execution role for Claimvoyant Lambda functions" > /dev/null
 
-    # Create inline policy
-    cat > /tmp/lambda-policy.json <<EOF
+    echo "  ✓ Lambda execution role created"
+fi
+
+# Inline policy, applied on every run so new permissions reach existing roles
+cat > /tmp/lambda-policy.json <<EOF
 {
   "Version": "2012-10-17",
   "Statement": [
@@ -216,6 +519,7 @@ EOF
       "Action": [
         "s3:GetObject",
         "s3:PutObject",
+        "s3:DeleteObject",
         "s3:ListBucket"
       ],
       "Resource": [
@@ -227,16 +531,38 @@ EOF
       "Effect": "Allow",
       "Action": [
         "dynamodb:PutItem",
+        "dynamodb:DeleteItem",
         "dynamodb:GetItem",
         "dynamodb:Query",
         "dynamodb:UpdateItem",
+        "dynamodb:BatchWriteItem",
         "dynamodb:Scan"
       ],
       "Resource": [
         "arn:aws:dynamodb:${AWS_REGION}:*:table/Claims",
-        "arn:aws:dynamodb:${AWS_REGION}:*:table/AuditLog"
+        "arn:aws:dynamodb:${AWS_REGION}:*:table/ClaimsLatest",
+        "arn:aws:dynamodb:${AWS_REGION}:*:table/ClaimsLatest/index/*",
+        "arn:aws:dynamodb:${AWS_REGION}:*:table/AuditLog",
+        "arn:aws:dynamodb:${AWS_REGION}:*:table/DecisionCache",
+        "arn:aws:dynamodb:${AWS_REGION}:*:table/PipelineStarts",
+        "arn:aws:dynamodb:${AWS_REGION}:*:table/PolicyCache"
       ]
     },
+    {
+      "Effect": "Allow",
+      "Action": [
+        "sqs:SendMessage",
+        "sqs:ReceiveMessage",
+        "sqs:DeleteMessage",
+        "sqs:GetQueueAttributes"
+      ],
+      "Resource": "${AUDIT_LOG_QUEUE_ARN}"
+    },
+    {
+      "Effect": "Allow",
+      "Action": "sqs:SendMessage",
+      "Resource": "${EXPRESS_FAILURE_QUEUE_ARN}"
+    },
     {
       "Effect": "Allow",
       "Action": [
@@ -257,7 +583,8 @@ EOF
     {
       "Effect": "Allow",
       "Action": [
-        "bedrock:InvokeModel"
+        "bedrock:InvokeModel",
+        "bedrock:InvokeModelWithResponseStream"
       ],
       "Resource": "arn:aws:bedrock:${AWS_REGION}::foundation-model/anthropic.claude-3-5-sonnet-20241022-v2:0"
     },
@@ -274,18 +601,44 @@ EOF
         "states:StartExecution"
       ],
       "Resource": "arn:aws:states:${AWS_REGION}:*:stateMachine:ClaimvoyantWorkflow"
+    },
+    {
+      "Effect": "Allow",
+      "Action": [
+        "states:SendTaskSuccess",
+        "states:SendTaskFailure"
+      ],
+      "Resource": "*"
+    },
+    {
+      "Effect": "Allow",
+      "Action": [
+        "iam:PassRole"
+      ],
+      "Resource": "${TEXTRACT_SNS_ROLE_ARN}",
+      "Condition": {
+        "StringEquals": {
+          "iam:PassedToService": "textract.amazonaws.com"
+        }
+      }
+    },
+    {
+      "Effect": "Allow",
+      "Action": [
+        "lambda:InvokeFunction"
+      ],
+      "Resource": "arn:aws:lambda:${AWS_REGION}:*:function:claimvoyant-express"
     }
   ]
 }
 EOF
 
-    aws iam put-role-policy \
-        --role-name "${LAMBDA_ROLE_NAME}" \
-        --policy-name ClaimvoyantLambdaPolicy \
-        --policy-document file:///tmp/lambda-policy.json
+aws iam put-role-policy \
+    --role-name "${LAMBDA_ROLE_NAME}" \
+    --policy-name ClaimvoyantLambdaPolicy \
+    --policy-document file:///tmp/lambda-policy.json
 
-    echo "  ✓ Lambda execution role created"
-fi
+echo "  ✓ Lambda execution role policy applied"
 
 # Step Functions Execution Role
 STEPFUNCTIONS_ROLE_NAME="ClaimvoyantStepFunctionsRole"
@@ -373,7 +726,10 @@ echo "Summary:"
 echo "  ✓ S3 Buckets: ${BUCKET_PREFIX}-{raw-claims,processed,reports,policies}"
 echo "  ✓ DynamoDB Tables: Claims, AuditLog"
 echo "  ✓ Secrets Manager: claimvoyant/weaviate"
-echo "  ✓ IAM Roles: ${LAMBDA_ROLE_NAME}, ${STEPFUNCTIONS_ROLE_NAME}"
+echo "  ✓ IAM Roles: ${LAMBDA_ROLE_NAME}, ${STEPFUNCTIONS_ROLE_NAME}, ${TEXTRACT_ROLE_NAME}"
+echo "  ✓ SNS Topic: claimvoyant-textract-completion"
+echo "  ✓ SQS Queue: claimvoyant-audit-log"
+echo "  ✓ SQS Queue: claimvoyant-express-failures"
 echo "  ✓ Bedrock: Claude 3.5 Sonnet access enabled"
 echo ""
 echo "Next steps:"
@@ -390,6 +746,13 @@ BUCKET_PREFIX=${BUCKET_PREFIX}
 WEAVIATE_URL=${WEAVIATE_URL}
 LAMBDA_ROLE_ARN=arn:aws:iam::${AWS_ACCOUNT_ID}:role/${LAMBDA_ROLE_NAME}
 STEPFUNCTIONS_ROLE_ARN=arn:aws:iam::${AWS_ACCOUNT_ID}:role/${STEPFUNCTIONS_ROLE_NAME}
+STATE_MACHINE_ARN=arn:aws:states:${AWS_REGION}:${AWS_ACCOUNT_ID}:stateMachine:ClaimvoyantWorkflow
+TEXTRACT_SNS_TOPIC_ARN=${TEXTRACT_SNS_TOPIC_ARN}
+TEXTRACT_SNS_ROLE_ARN=${TEXTRACT_SNS_ROLE_ARN}
+AUDIT_LOG_QUEUE_URL=${AUDIT_LOG_QUEUE_URL}
+AUDIT_LOG_QUEUE_ARN=${AUDIT_LOG_QUEUE_ARN}
+EXPRESS_FAILURE_QUEUE_ARN=${EXPRESS_FAILURE_QUEUE_ARN}
+POLICY_CACHE_TABLE=PolicyCache
 EOF
 
 echo "Configuration saved to .aws-config"
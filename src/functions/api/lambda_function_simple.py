@@ -3,25 +3,80 @@ Simplified API Lambda Function without FastAPI dependencies.
 Uses pure Python with boto3 only.
 """
 
+import base64
+import hashlib
 import json
+import mimetypes
 import os
-from datetime import datetime
+import time
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import unquote_plus
 
 import boto3
 
+from shared.ids import new_claim_id
+from shared.pipeline import PIPELINE_EXPRESS, PIPELINE_STEPFUNCTIONS, PIPELINES
+from shared.utils import claims_list_pk, decimal_default
+
 # AWS clients
 s3 = boto3.client("s3")
 dynamodb = boto3.resource("dynamodb")
 stepfunctions = boto3.client("stepfunctions")
+lambda_client = boto3.client("lambda")
 
 # DynamoDB tables
 claims_table = dynamodb.Table("Claims")
+claims_latest_table = dynamodb.Table("ClaimsLatest")
 audit_log_table = dynamodb.Table("AuditLog")
 
 # Environment variables
 BUCKET_PREFIX = os.environ.get("BUCKET_PREFIX", "claimvoyant")
 STATE_MACHINE_ARN = os.environ.get("STATE_MACHINE_ARN", "")
 
+# Claims run through Step Functions unless routed to the in-process express pipeline
+DEFAULT_PIPELINE = os.environ.get("DEFAULT_PIPELINE", PIPELINE_STEPFUNCTIONS)
+EXPRESS_FUNCTION_NAME = os.environ.get("EXPRESS_FUNCTION_NAME", "claimvoyant-express")
+
+# Express starts are deduplicated by a conditional put (DynamoDB table with TTL enabled
+# on "expires_at"), standing in for Step Functions' unique execution names
+PIPELINE_STARTS_TABLE = os.environ.get("PIPELINE_STARTS_TABLE", "PipelineStarts")
+PIPELINE_START_TTL = int(os.environ.get("PIPELINE_START_TTL", str(7 * 24 * 3600)))
+pipeline_starts_table = dynamodb.Table(PIPELINE_STARTS_TABLE)
+
+# Claim listing (ClaimsLatest items in one GSI partition per day, sorted by timestamp)
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+LIST_LOOKBACK_DAYS = int(os.environ.get("LIST_LOOKBACK_DAYS", "365"))
+LIST_MAX_SHARDS_PER_PAGE = 31
+
+# Direct-to-S3 uploads (presigned URLs, multipart above the threshold)
+UPLOAD_URL_EXPIRY = int(os.environ.get("UPLOAD_URL_EXPIRY", "900"))
+UPLOAD_MULTIPART_THRESHOLD = 100 * 1024 * 1024
+UPLOAD_PART_SIZE = 16 * 1024 * 1024
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024 * 1024
+MAX_UPLOAD_FILES = 25
+UPLOAD_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png")
+
+# Large Claims attributes returned only on request via ?include=
+INCLUDABLE_FIELDS = ("extracted_data", "policy_data")
+
+# Claims attributes read for a claim that is not yet in ClaimsLatest
+CLAIM_VERSION_FIELDS = ("claim_id", "version", "status", "timestamp", "decision_data", "entities")
+
+# ClaimsLatest read-model attributes returned by the list and detail routes
+CLAIM_SUMMARY_FIELDS = ("claim_id", "version", "status", "timestamp", "decision", "confidence")
+CLAIM_DETAIL_FIELDS = (
+    "claim_id",
+    "version",
+    "status",
+    "timestamp",
+    "decision",
+    "reasoning",
+    "confidence",
+    "estimated_payout",
+    "entities",
+)
+
 
 def response(status_code, body):
     """Create API Gateway response."""
@@ -33,7 +88,7 @@ def response(status_code, body):
             "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
             "Access-Control-Allow-Headers": "Content-Type",
         },
-        "body": json.dumps(body),
+        "body": json.dumps(body, default=decimal_default),
     }
 
 
@@ -62,11 +117,11 @@ def handler(event, context):
             return handle_health_check()
 
         elif path == "/api/v1/claims" and http_method == "GET":
-            return handle_list_claims()
+            return handle_list_claims(**parse_list_params(event))
 
         elif path.startswith("/api/v1/claims/") and http_method == "GET":
             claim_id = path.split("/")[-1]
-            return handle_get_claim(claim_id)
+            return handle_get_claim(claim_id, **parse_get_params(event))
 
         elif path == "/api/v1/claims/upload" and http_method == "POST":
             return handle_upload_claim(event)
@@ -95,53 +150,268 @@ def handle_health_check():
     )
 
 
-def handle_list_claims():
-    """List recent claims."""
+def projection(fields):
+    """Build ProjectionExpression arguments, aliasing every name to avoid reserved words."""
+    return {
+        "ProjectionExpression": ", ".join(f"#{field}" for field in fields),
+        "ExpressionAttributeNames": {f"#{field}": field for field in fields},
+    }
+
+
+def encode_cursor(state):
+    """Encode listing position (day shard and/or LastEvaluatedKey) as an opaque page token."""
+    if not state:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, status=None):
+    """
+    Decode a page token produced by encode_cursor for the same listing.
+
+    Timestamp listings resume from {"day", "key"}, status listings from {"key"};
+    a key must be a LastEvaluatedKey of that listing's index and partition.
+    """
     try:
-        scan_response = claims_table.scan(Limit=10)
-        items = scan_response.get("Items", [])
-
-        # Group by claim_id and keep latest version
-        claims_dict = {}
-        for item in items:
-            claim_id = item["claim_id"]
-            if claim_id not in claims_dict:
-                claims_dict[claim_id] = item
-            else:
-                if item["version"] > claims_dict[claim_id]["version"]:
-                    claims_dict[claim_id] = item
-
-        # Format response
-        claims = []
-        for claim in claims_dict.values():
-            decision_data = json.loads(claim.get("decision_data", "{}"))
-            claims.append(
-                {
-                    "claim_id": claim["claim_id"],
-                    "version": claim["version"],
-                    "status": claim["status"],
-                    "timestamp": claim["timestamp"],
-                    "decision": decision_data.get("decision"),
-                    "confidence": decision_data.get("confidence"),
-                }
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(state, dict):
+        raise ValueError("Invalid cursor")
+
+    if status:
+        partition = {"status": status.upper()}
+        valid = set(state) == {"key"} and state["key"] is not None
+    else:
+        valid = set(state) == {"day", "key"} and isinstance(state["day"], str)
+        try:
+            partition = {"list_pk": claims_list_pk(date.fromisoformat(state["day"]).isoformat())}
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+
+    key = state.get("key")
+    if key is not None:
+        valid = (
+            valid
+            and isinstance(key, dict)
+            and set(key) == {"claim_id", "timestamp", *partition}
+            and all(isinstance(value, str) for value in key.values())
+            and all(key[name] == value for name, value in partition.items())
+        )
+    if not valid:
+        raise ValueError("Invalid cursor")
+    return state
+
+
+def parse_list_params(event):
+    """Parse limit, cursor, status, since and until query parameters for the list route."""
+    params = event.get("queryStringParameters") or {}
+    list_params = {}
+
+    if params.get("limit"):
+        list_params["limit"] = params["limit"]
+    for name in ("cursor", "status", "since", "until"):
+        if params.get(name):
+            list_params[name] = params[name]
+
+    return list_params
+
+
+def parse_get_params(event):
+    """Parse the comma-separated include query parameter for the detail route."""
+    params = event.get("queryStringParameters") or {}
+    fields = [field.strip() for field in (params.get("include") or "").split(",")]
+    include = list(dict.fromkeys(field for field in fields if field))
+
+    return {"include": include} if include else {}
+
+
+def query_claims_latest(index_name, key_condition, attribute_values, limit, start_key=None):
+    """Run one newest-first ClaimsLatest GSI query and return its items and LastEvaluatedKey."""
+    query_params = {
+        "IndexName": index_name,
+        "KeyConditionExpression": key_condition,
+        "ExpressionAttributeValues": attribute_values,
+        "ScanIndexForward": False,
+        "Limit": limit,
+        # Read-model attributes are aliased as #<name>, which also covers the key conditions
+        **projection(CLAIM_SUMMARY_FIELDS),
+    }
+    if start_key:
+        query_params["ExclusiveStartKey"] = start_key
+
+    query_response = claims_latest_table.query(**query_params)
+
+    return query_response.get("Items", []), query_response.get("LastEvaluatedKey")
+
+
+def list_claims_by_day(limit, state, since, until, range_condition, range_values):
+    """
+    Fill a page from the day-sharded LatestByTimestamp partitions, newest day first.
+
+    At most LIST_MAX_SHARDS_PER_PAGE days are queried per request, so a page may
+    be short while next_cursor still points at older days.
+    """
+    today = datetime.now(timezone.utc).date()
+    if state:
+        day = date.fromisoformat(state["day"])
+    else:
+        day = min(date.fromisoformat(until[:10]), today) if until else today
+    first_day = (
+        date.fromisoformat(since[:10]) if since else today - timedelta(days=LIST_LOOKBACK_DAYS)
+    )
+    start_key = state.get("key") if state else None
+
+    items = []
+    for _ in range(LIST_MAX_SHARDS_PER_PAGE):
+        if day < first_day or len(items) >= limit:
+            break
+
+        shard_items, start_key = query_claims_latest(
+            "LatestByTimestamp",
+            "list_pk = :pk" + range_condition,
+            {":pk": claims_list_pk(day.isoformat()), **range_values},
+            limit - len(items),
+            start_key,
+        )
+        items.extend(shard_items)
+
+        if not start_key:
+            day -= timedelta(days=1)
+
+    if day < first_day:
+        return items, None
+    return items, {"day": day.isoformat(), "key": start_key}
+
+
+def handle_list_claims(limit=DEFAULT_PAGE_SIZE, cursor=None, status=None, since=None, until=None):
+    """List claims newest-first from the ClaimsLatest indexes, one page at a time."""
+    try:
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        for name, value in (("since", since), ("until", until)):
+            if value:
+                try:
+                    datetime.fromisoformat(value)
+                except ValueError:
+                    raise ValueError(f"{name} must be an ISO 8601 date or timestamp")
+
+        # A bare until date includes the whole day: bound by the next day's date, which
+        # sorts after every timestamp of that day and equals none (timestamps carry a time)
+        until_bound, until_inclusive = until, True
+        if until and "T" not in until:
+            until_bound = (date.fromisoformat(until) + timedelta(days=1)).isoformat()
+            until_inclusive = False
+        if (
+            since
+            and until
+            and (since > until_bound or since == until_bound and not until_inclusive)
+        ):
+            raise ValueError("since must not be after until")
+
+        state = decode_cursor(cursor, status) if cursor else None
+
+        # Status and date range are key conditions on the GSI, never scan filters
+        range_condition = ""
+        range_values = {}
+        if since and until:
+            range_condition = " AND #timestamp BETWEEN :since AND :until"
+        elif since:
+            range_condition = " AND #timestamp >= :since"
+        elif until:
+            range_condition = " AND #timestamp " + ("<=" if until_inclusive else "<") + " :until"
+        if since:
+            range_values[":since"] = since
+        if until:
+            range_values[":until"] = until_bound
+
+        if status:
+            items, start_key = query_claims_latest(
+                "LatestByStatus",
+                "#status = :status" + range_condition,
+                {":status": status.upper(), **range_values},
+                limit,
+                state.get("key") if state else None,
+            )
+            next_state = {"key": start_key} if start_key else None
+        else:
+            items, next_state = list_claims_by_day(
+                limit, state, since, until, range_condition, range_values
             )
 
-        claims.sort(key=lambda x: x["timestamp"], reverse=True)
+        claims = [{field: claim.get(field) for field in CLAIM_SUMMARY_FIELDS} for claim in items]
 
-        return response(200, {"claims": claims})
+        return response(200, {"claims": claims, "next_cursor": encode_cursor(next_state)})
+
+    except ValueError as e:
+        return response(400, {"error": str(e)})
 
     except Exception as e:
         return response(500, {"error": str(e)})
 
 
-def handle_get_claim(claim_id):
-    """Get claim details."""
+def get_claim_attributes(claim_id, version, fields):
+    """Fetch large JSON attributes of one claim version on demand."""
+    item = claims_table.get_item(
+        Key={"claim_id": claim_id, "version": version}, **projection(included_attributes(fields))
+    ).get("Item", {})
+
+    return {field: load_included_field(item, field) for field in fields}
+
+
+def included_attributes(fields):
+    """Return the Claims attributes needed to build the included fields."""
+    if "extracted_data" in fields:
+        return tuple(fields) + ("extracted_data_ref",)
+    return tuple(fields)
+
+
+def load_included_field(item, field):
+    """Decode one included field; the full extraction is read from its S3 object if stored."""
+    if field == "extracted_data" and "extracted_data_ref" in item:
+        ref = json.loads(item["extracted_data_ref"])
+        return json.loads(s3.get_object(Bucket=ref["bucket"], Key=ref["key"])["Body"].read())
+
+    return json.loads(item[field]) if field in item else None
+
+
+def handle_get_claim(claim_id, include=()):
+    """Get claim details, optionally including large attributes listed in include."""
     try:
+        unknown = [field for field in include if field not in INCLUDABLE_FIELDS]
+        if unknown:
+            return response(
+                400,
+                {
+                    "error": f"Unsupported include: {', '.join(unknown)}",
+                    "supported": list(INCLUDABLE_FIELDS),
+                },
+            )
+
+        # Materialized read model written by the decision agent
+        latest = claims_latest_table.get_item(
+            Key={"claim_id": claim_id}, **projection(CLAIM_DETAIL_FIELDS)
+        ).get("Item")
+
+        if latest:
+            claim = {field: latest.get(field) for field in CLAIM_DETAIL_FIELDS}
+            if include:
+                claim.update(get_claim_attributes(claim_id, latest["version"], include))
+            return response(200, claim)
+
+        # Claims decided before ClaimsLatest existed only have versioned items
         query_response = claims_table.query(
             KeyConditionExpression="claim_id = :cid",
             ExpressionAttributeValues={":cid": claim_id},
             ScanIndexForward=False,
             Limit=1,
+            **projection(CLAIM_VERSION_FIELDS + included_attributes(include)),
         )
 
         items = query_response.get("Items", [])
@@ -162,64 +432,310 @@ def handle_get_claim(claim_id):
         decision_data = json.loads(claim.get("decision_data", "{}"))
         entities = json.loads(claim.get("entities", "{}"))
 
-        return response(
-            200,
-            {
-                "claim_id": claim_id,
-                "version": claim.get("version"),
-                "status": claim.get("status"),
-                "timestamp": claim.get("timestamp"),
-                "decision": decision_data.get("decision"),
-                "reasoning": decision_data.get("reasoning"),
-                "confidence": decision_data.get("confidence"),
-                "estimated_payout": decision_data.get("estimated_payout"),
-                "entities": entities,
-            },
-        )
+        claim_details = {
+            "claim_id": claim_id,
+            "version": claim.get("version"),
+            "status": claim.get("status"),
+            "timestamp": claim.get("timestamp"),
+            "decision": decision_data.get("decision"),
+            "reasoning": decision_data.get("reasoning"),
+            "confidence": decision_data.get("confidence"),
+            "estimated_payout": decision_data.get("estimated_payout"),
+            "entities": entities,
+        }
+        for field in include:
+            claim_details[field] = load_included_field(claim, field)
+
+        return response(200, claim_details)
 
     except Exception as e:
         return response(500, {"error": str(e)})
 
 
+def unique_key(key, used):
+    """Number a repeated key ("a.jpg" -> "a-2.jpg") so every claim file gets its own object."""
+    base, extension = os.path.splitext(key)
+    candidate, number = key, 2
+    while candidate in used:
+        candidate = f"{base}-{number}{extension}"
+        number += 1
+
+    return candidate
+
+
+def upload_key(claim_id, filename):
+    """Build the raw-claims object key for an uploaded file."""
+    name = os.path.basename(str(filename).replace("\\", "/")).strip()
+    if not name or name.startswith("."):
+        raise ValueError(f"Invalid filename: {filename!r}")
+
+    extension = os.path.splitext(name)[1].lower()
+    if extension not in UPLOAD_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: {extension or name}")
+
+    return f"{claim_id}/{name}"
+
+
+def presign_multipart_upload(bucket, key, content_type, size, metadata):
+    """Start a multipart upload and presign a URL for each of its parts."""
+    part_count = -(-size // UPLOAD_PART_SIZE)
+    upload = s3.create_multipart_upload(
+        Bucket=bucket, Key=key, ContentType=content_type, Metadata=metadata
+    )
+    upload_id = upload["UploadId"]
+
+    parts = [
+        {
+            "part_number": part_number,
+            "url": s3.generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": bucket,
+                    "Key": key,
+                    "UploadId": upload_id,
+                    "PartNumber": part_number,
+                },
+                ExpiresIn=UPLOAD_URL_EXPIRY,
+            ),
+        }
+        for part_number in range(1, part_count + 1)
+    ]
+
+    complete_url = s3.generate_presigned_url(
+        "complete_multipart_upload",
+        Params={"Bucket": bucket, "Key": key, "UploadId": upload_id},
+        ExpiresIn=UPLOAD_URL_EXPIRY,
+    )
+
+    return {
+        "method": "MULTIPART",
+        "upload_id": upload_id,
+        "part_size": UPLOAD_PART_SIZE,
+        "parts": parts,
+        "complete_url": complete_url,
+    }
+
+
+def presign_upload(bucket, key, content_type, size, metadata):
+    """Presign a single POST, or a multipart upload for files above the threshold.
+
+    The POST policy pins the content type and metadata and caps the body at the
+    declared size, so S3 rejects anything larger.
+    """
+    if size > UPLOAD_MULTIPART_THRESHOLD:
+        return presign_multipart_upload(bucket, key, content_type, size, metadata)
+
+    fields = {
+        "Content-Type": content_type,
+        **{f"x-amz-meta-{name}": value for name, value in metadata.items()},
+    }
+    post = s3.generate_presigned_post(
+        Bucket=bucket,
+        Key=key,
+        Fields=fields,
+        Conditions=[
+            *({name: value} for name, value in fields.items()),
+            ["content-length-range", 1, size],
+        ],
+        ExpiresIn=UPLOAD_URL_EXPIRY,
+    )
+    return {"method": "POST", "url": post["url"], "fields": post["fields"]}
+
+
 def handle_upload_claim(event):
-    """Handle claim upload (simplified - expects base64 encoded file)."""
+    """Handle claim upload by returning presigned S3 URLs for the claim's files.
+
+    Files are uploaded straight to the raw-claims bucket and the S3
+    object-created event starts the workflow (see object_created_handler).
+    """
     try:
         # Parse body
         body = event.get("body", "")
         if event.get("isBase64Encoded"):
-            import base64
-
             body = base64.b64decode(body).decode("utf-8")
 
         data = json.loads(body) if body else {}
+        files = data.get("files") or []
+        pipeline = data.get("pipeline") or DEFAULT_PIPELINE
 
-        # Generate claim ID
-        claim_id = f"CLAIM-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        if not files:
+            return response(400, {"error": "Request body must list at least one file"})
+        if len(files) > MAX_UPLOAD_FILES:
+            return response(400, {"error": f"At most {MAX_UPLOAD_FILES} files per claim"})
+        if pipeline not in PIPELINES:
+            return response(400, {"error": f"pipeline must be one of {', '.join(PIPELINES)}"})
 
-        # For now, just trigger Step Functions with dummy data
-        # In production, this would handle actual file uploads
+        # Generate claim ID
+        claim_id = new_claim_id()
+        bucket = f"{BUCKET_PREFIX}-raw-claims"
+
+        # Every file records the claim's pipeline and file count, so the
+        # object-created trigger can start the claim once all files arrive
+        metadata = {"pipeline": pipeline, "claim-files": str(len(files))}
+
+        uploads = []
+        keys = set()
+        for file in files:
+            key = unique_key(upload_key(claim_id, file.get("filename", "")), keys)
+            keys.add(key)
+            content_type = (
+                file.get("content_type")
+                or mimetypes.guess_type(key)[0]
+                or "application/octet-stream"
+            )
+            size = int(file.get("size") or 0)
 
-        if STATE_MACHINE_ARN:
-            execution_input = {
-                "claim_id": claim_id,
-                "bucket": f"{BUCKET_PREFIX}-raw-claims",
-                "key": f"{claim_id}/test.txt",
-            }
+            # The declared size bounds what the presigned upload accepts
+            if size < 1 or size > MAX_UPLOAD_SIZE:
+                raise ValueError(f"Invalid size for {file.get('filename')}: {size}")
 
-            stepfunctions.start_execution(
-                stateMachineArn=STATE_MACHINE_ARN,
-                name=f"{claim_id}-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                input=json.dumps(execution_input),
+            # Multipart parts aren't size-limited, so the trigger checks the declared size
+            upload = presign_upload(
+                bucket, key, content_type, size, {**metadata, "declared-size": str(size)}
             )
+            uploads.append({"filename": os.path.basename(key), "key": key, **upload})
 
         return response(
             200,
             {
                 "claim_id": claim_id,
-                "status": "processing",
-                "message": "Claim uploaded successfully",
+                "status": "awaiting_upload",
+                "pipeline": pipeline,
+                "bucket": bucket,
+                "expires_in": UPLOAD_URL_EXPIRY,
+                "uploads": uploads,
             },
         )
 
+    except (ValueError, TypeError, AttributeError) as e:
+        return response(400, {"error": str(e)})
     except Exception as e:
         return response(500, {"error": str(e)})
+
+
+def get_created_objects(event):
+    """Extract (bucket, key) pairs from an S3 notification or EventBridge event."""
+    if event.get("detail-type") == "Object Created":
+        detail = event.get("detail", {})
+        return [(detail["bucket"]["name"], detail["object"]["key"])]
+
+    return [
+        (record["s3"]["bucket"]["name"], unquote_plus(record["s3"]["object"]["key"]))
+        for record in event.get("Records", [])
+        if "s3" in record
+    ]
+
+
+def get_upload_metadata(bucket, key):
+    """Return the pipeline, claim file count and sizes an object was uploaded with."""
+    head = s3.head_object(Bucket=bucket, Key=key)
+    metadata = head.get("Metadata", {})
+    pipeline = metadata.get("pipeline", DEFAULT_PIPELINE)
+
+    return {
+        "pipeline": pipeline if pipeline in PIPELINES else DEFAULT_PIPELINE,
+        "claim_files": int(metadata.get("claim-files") or 1),
+        "size": head["ContentLength"],
+        "declared_size": int(metadata.get("declared-size") or MAX_UPLOAD_SIZE),
+    }
+
+
+def count_objects(bucket, prefix):
+    """Count the objects uploaded under a claim prefix."""
+    return s3.list_objects_v2(Bucket=bucket, Prefix=prefix).get("KeyCount", 0)
+
+
+def claim_pipeline_start(execution_name):
+    """Record an express pipeline start; return False if it was already started."""
+    now = int(time.time())
+    try:
+        pipeline_starts_table.put_item(
+            Item={
+                "execution_name": execution_name,
+                "started_at": datetime.now().isoformat(),
+                "expires_at": now + PIPELINE_START_TTL,
+            },
+            # TTL deletes lazily, so an expired marker counts as absent
+            ConditionExpression="attribute_not_exists(execution_name) OR expires_at < :now",
+            ExpressionAttributeValues={":now": now},
+        )
+        return True
+    except pipeline_starts_table.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+
+
+def release_pipeline_start(execution_name):
+    """Remove a start marker so a redelivered event can retry a failed start."""
+    pipeline_starts_table.delete_item(Key={"execution_name": execution_name})
+
+
+def object_created_handler(event, context):
+    """
+    Start the claim workflow for objects uploaded to the raw-claims bucket.
+
+    Single-file claims start per object. Multi-document claims start once, with
+    their prefix, when the last of their files arrives.
+    """
+    executions = []
+
+    for bucket, key in get_created_objects(event):
+        claim_id = key.split("/", 1)[0]
+        if "/" not in key or not claim_id.startswith("CLAIM-"):
+            print(f"Skipping object outside a claim prefix: s3://{bucket}/{key}")
+            continue
+
+        upload = get_upload_metadata(bucket, key)
+        prefix = f"{claim_id}/"
+
+        if upload["size"] > upload["declared_size"]:
+            # Multipart uploads can exceed the size they were presigned for; drop the object
+            print(
+                f"Rejecting s3://{bucket}/{key}: {upload['size']} bytes, "
+                f"declared {upload['declared_size']}"
+            )
+            s3.delete_object(Bucket=bucket, Key=key)
+            continue
+
+        if upload["claim_files"] > 1:
+            uploaded = count_objects(bucket, prefix)
+            if uploaded < upload["claim_files"]:
+                print(f"Claim {claim_id}: {uploaded} of {upload['claim_files']} files uploaded")
+                continue
+
+            execution_input = {"claim_id": claim_id, "bucket": bucket, "prefix": prefix}
+            execution_name = claim_id
+        else:
+            # Deterministic name makes redelivered S3 events a no-op
+            key_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+            execution_input = {"claim_id": claim_id, "bucket": bucket, "key": key}
+            execution_name = f"{claim_id}-{key_hash}"[:80]
+
+        if upload["pipeline"] == PIPELINE_EXPRESS:
+            # Async invokes have no idempotency key, so redelivered events are caught here
+            if not claim_pipeline_start(execution_name):
+                print(f"Express pipeline {execution_name} already started")
+                continue
+
+            try:
+                lambda_client.invoke(
+                    FunctionName=EXPRESS_FUNCTION_NAME,
+                    InvocationType="Event",
+                    Payload=json.dumps(execution_input),
+                )
+            except Exception:
+                release_pipeline_start(execution_name)
+                raise
+            executions.append(f"{EXPRESS_FUNCTION_NAME}:{execution_name}")
+            continue
+
+        try:
+            stepfunctions.start_execution(
+                stateMachineArn=STATE_MACHINE_ARN,
+                name=execution_name,
+                input=json.dumps(execution_input),
+            )
+            executions.append(execution_name)
+        except stepfunctions.exceptions.ExecutionAlreadyExists:
+            print(f"Execution {execution_name} already started")
+
+    return {"statusCode": 200, "executions": executions}
@@ -0,0 +1,13 @@
+"""
+Audit Log Drain Lambda Function
+
+Consumes the audit queue agents write to when AUDIT_LOG_QUEUE_URL is set and
+batch-writes the entries into the DynamoDB AuditLog table.
+"""
+
+from shared.audit import sqs_handler
+
+
+def lambda_handler(event, context):
+    """Lambda handler for the audit queue event source mapping."""
+    return sqs_handler(event, context)
@@ -9,13 +9,8 @@ import json
 from datetime import datetime
 from typing import Any, Dict
 
-import boto3
-
-# AWS clients
-dynamodb = boto3.resource("dynamodb")
-
-# DynamoDB table
-audit_log_table = dynamodb.Table("AuditLog")
+from shared.audit import new_audit_writer
+from shared.context import ClaimContext
 
 
 def assess_damage(extracted_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -46,11 +41,14 @@ def assess_damage(extracted_data: Dict[str, Any]) -> Dict[str, Any]:
 
 def lambda_handler(event, context):
     """Lambda handler for Damage Agent."""
+    audit = new_audit_writer()
+
     try:
         print(f"Event: {json.dumps(event)}")
 
         claim_id = event.get("claim_id")
-        extracted_data = event.get("extracted_data", {})
+        context = ClaimContext.from_event(event)
+        extracted_data = context.get("extracted_data", {})
 
         print(f"Assessing damage for claim {claim_id}")
 
@@ -59,8 +57,8 @@ def lambda_handler(event, context):
 
         # Log to DynamoDB AuditLog
         log_id = f"{claim_id}-damage"
-        audit_log_table.put_item(
-            Item={
+        audit.put(
+            {
                 "log_id": log_id,
                 "timestamp": datetime.now().isoformat(),
                 "claim_id": claim_id,
@@ -71,14 +69,16 @@ def lambda_handler(event, context):
             }
         )
 
+        context.put("damage_assessment", damage_assessment)
+
+        audit.flush()
+
         # Return result for Step Functions
         return {
             "statusCode": 200,
             "claim_id": claim_id,
+            "context_ref": context.reference(),
             "damage_assessment": damage_assessment,
-            "policy_data": event.get("policy_data"),
-            "entities": event.get("entities"),
-            "extracted_data": extracted_data,
         }
 
     except Exception as e:
@@ -88,3 +88,6 @@ def lambda_handler(event, context):
         traceback.print_exc()
 
         return {"statusCode": 500, "error": str(e)}
+
+    finally:
+        audit.close()
@@ -5,13 +5,21 @@ Uses AWS Bedrock Claude 3.5 Sonnet to make intelligent claim decisions
 based on extracted data, policy details, and damage assessment.
 """
 
+import hashlib
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Optional
 
 import boto3
 
+from shared.audit import new_audit_writer
+from shared.context import ClaimContext
+from shared.utils import claims_list_pk, to_dynamodb_value
+
 # AWS clients
 s3 = boto3.client("s3")
 dynamodb = boto3.resource("dynamodb")
@@ -19,26 +27,145 @@ bedrock = boto3.client("bedrock-runtime", region_name="us-east-1")
 
 # DynamoDB table
 claims_table = dynamodb.Table("Claims")
-audit_log_table = dynamodb.Table("AuditLog")
+claims_latest_table = dynamodb.Table("ClaimsLatest")
+
+# Bedrock model used for claim decisions
+MODEL_ID = "anthropic.claude-3-5-sonnet-20241022-v2:0"
+
+# Content-addressed decision cache (DynamoDB table with TTL enabled on "expires_at")
+DECISION_CACHE_TABLE = os.environ.get("DECISION_CACHE_TABLE", "DecisionCache")
+DECISION_CACHE_TTL = int(os.environ.get("DECISION_CACHE_TTL", str(7 * 24 * 3600)))
+decision_cache_table = dynamodb.Table(DECISION_CACHE_TABLE) if DECISION_CACHE_TABLE else None
+
+# Stream the completion with invoke_model_with_response_stream instead of waiting for it
+BEDROCK_STREAMING = os.environ.get("BEDROCK_STREAMING", "false").lower() == "true"
+
+# Keys the decision JSON must contain before streaming can stop early
+REQUIRED_KEYS = (
+    "decision",
+    "reasoning",
+    "confidence",
+    "estimated_payout",
+    "deductible_applies",
+    "required_actions",
+    "risk_factors",
+)
+
+JSON_DECODER = json.JSONDecoder()
+
+# Claim-context sections the decision reads
+DECISION_CONTEXT_SECTIONS = ("policy_data", "extracted_data", "entities")
+
+# Policy fields sent to the model (lookup metadata such as match_type is left out)
+POLICY_PROMPT_FIELDS = (
+    "policy_id",
+    "coverage_type",
+    "deductible",
+    "coverage_limit",
+    "filing_deadline_days",
+    "content",
+)
+
+# Token budget for OCR document text in the prompt; longer text keeps its head and tail
+PROMPT_DOCUMENT_TOKEN_BUDGET = int(os.environ.get("PROMPT_DOCUMENT_TOKEN_BUDGET", "2000"))
+
+# Token budget per text field of the extracted data kept in the Claims item; the full
+# extraction is kept in the reports bucket (claim-context/ copies expire)
+CLAIM_ITEM_TEXT_TOKEN_BUDGET = 1000
+
+
+def build_request_body(prompt: str) -> str:
+    """Build the Bedrock Messages API request body for a decision prompt."""
+    request_body = {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 2048,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.3,  # Lower temperature for more deterministic decisions
+    }
+
+    return json.dumps(request_body)
+
+
+def parse_complete_decision(text: str) -> Optional[Dict[str, Any]]:
+    """Return the decision once the streamed text holds a complete JSON object with all keys."""
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    try:
+        decision_data, _ = JSON_DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+
+    if isinstance(decision_data, dict) and all(key in decision_data for key in REQUIRED_KEYS):
+        return decision_data
+
+    return None
+
+
+def invoke_claude_streaming(model_id: str, prompt: str) -> Dict[str, Any]:
+    """Stream the completion and stop reading as soon as the decision JSON is complete."""
+    start = time.perf_counter()
+    first_token_at = None
+    chunks = []
+    decision_data = None
+
+    response = bedrock.invoke_model_with_response_stream(
+        modelId=model_id, body=build_request_body(prompt)
+    )
+    stream = response["body"]
+
+    try:
+        for event in stream:
+            chunk = json.loads(event["chunk"]["bytes"]) if "chunk" in event else {}
+
+            if chunk.get("type") != "content_block_delta":
+                continue
+
+            text = chunk["delta"].get("text", "")
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            chunks.append(text)
+
+            # Only a closing brace can complete the object
+            if "}" in text:
+                decision_data = parse_complete_decision("".join(chunks))
+                if decision_data is not None:
+                    break
+    finally:
+        stream.close()
+
+    if decision_data is None:
+        # Stream ended before all required keys appeared; accept whatever object was returned
+        text = "".join(chunks)
+        decision_data, _ = JSON_DECODER.raw_decode(text, max(text.find("{"), 0))
+
+    total_ms = (time.perf_counter() - start) * 1000
+    first_token_ms = (first_token_at - start) * 1000 if first_token_at else total_ms
+    print(
+        f"Bedrock streaming latency: time_to_first_token_ms={first_token_ms:.0f} "
+        f"total_ms={total_ms:.0f}"
+    )
+
+    return decision_data
 
 
 def invoke_claude(prompt: str) -> Dict[str, Any]:
     """Invoke AWS Bedrock Claude 3.5 Sonnet for claim reasoning."""
     try:
-        model_id = "anthropic.claude-3-5-sonnet-20241022-v2:0"
+        model_id = MODEL_ID
 
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2048,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3,  # Lower temperature for more deterministic decisions
-        }
+        if BEDROCK_STREAMING:
+            return invoke_claude_streaming(model_id, prompt)
 
-        response = bedrock.invoke_model(modelId=model_id, body=json.dumps(request_body))
+        start = time.perf_counter()
+        response = bedrock.invoke_model(modelId=model_id, body=build_request_body(prompt))
 
         response_body = json.loads(response["body"].read())
         content = response_body["content"][0]["text"]
 
+        print(f"Bedrock latency: total_ms={(time.perf_counter() - start) * 1000:.0f}")
+
         # Parse JSON response from Claude
         # Claude is instructed to return structured JSON
         decision_data = json.loads(content)
@@ -54,25 +181,90 @@ def invoke_claude(prompt: str) -> Dict[str, Any]:
         }
 
 
-def build_decision_prompt(event: Dict[str, Any]) -> str:
+def compact_json(data: Any) -> str:
+    """Serialize data as JSON without insignificant whitespace."""
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Trim text to roughly max_tokens, keeping the beginning and end of the document."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+
+    # Police reports front-load parties and dates and end with the narrative/signatures
+    head_chars = max_chars * 2 // 3
+    tail_chars = max_chars - head_chars
+    omitted = len(text) - head_chars - tail_chars
+
+    return f"{text[:head_chars]}\n[... {omitted} characters omitted ...]\n{text[-tail_chars:]}"
+
+
+def build_prompt_sections(event: Dict[str, Any]) -> Dict[str, str]:
+    """Build compact, field-selected prompt sections from the claim state."""
+    policy_data = event.get("policy_data") or {}
+    extracted_data = event.get("extracted_data") or {}
+    entities = event.get("entities") or {}
+
+    policy = {field: policy_data.get(field) for field in POLICY_PROMPT_FIELDS}
+    if not policy_data.get("found", True):
+        policy = {"found": False, "error": policy_data.get("error")}
+
+    evidence = {
+        "file_type": extracted_data.get("file_type"),
+        "labels": [
+            f"{label['name']} ({label['confidence']:.0f}%)"
+            for label in extracted_data.get("labels", [])
+        ],
+        "image_text": extracted_data.get("detected_text"),
+        "error": extracted_data.get("error"),
+    }
+
+    return {
+        "policy": compact_json({k: v for k, v in policy.items() if v is not None}),
+        "evidence": compact_json({k: v for k, v in evidence.items() if v}),
+        "entities": compact_json({k: v for k, v in entities.items() if v is not None}),
+        "document_text": truncate_text(
+            extracted_data.get("text", ""), PROMPT_DOCUMENT_TOKEN_BUDGET
+        ),
+    }
+
+
+def summarize_extracted_data(extracted_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Trim the extracted document and image text for the versioned Claims item."""
+    summary = dict(extracted_data)
+    for field in ("text", "detected_text"):
+        if summary.get(field):
+            summary[field] = truncate_text(summary[field], CLAIM_ITEM_TEXT_TOKEN_BUDGET)
+
+    return summary
+
+
+def build_decision_prompt(event: Dict[str, Any], sections: Optional[Dict[str, str]] = None) -> str:
     """Build comprehensive prompt for Claude to make claim decision."""
     claim_id = event.get("claim_id")
-    policy_data = event.get("policy_data", {})
-    extracted_data = event.get("extracted_data", {})
-    entities = event.get("entities", {})
+    sections = sections or build_prompt_sections(event)
 
     prompt = f"""You are an expert auto insurance claims adjuster. Analyze the following claim and provide a decision.
 
 CLAIM ID: {claim_id}
 
 POLICY INFORMATION:
-{json.dumps(policy_data, indent=2)}
+{sections["policy"]}
 
 EXTRACTED CLAIM DATA:
-{json.dumps(extracted_data, indent=2)}
+{sections["evidence"]}
+
+DOCUMENT TEXT:
+{sections["document_text"] or "(none)"}
 
 EXTRACTED ENTITIES:
-{json.dumps(entities, indent=2)}
+{sections["entities"]}
 
 INSTRUCTIONS:
 1. Review the policy coverage and limits
@@ -95,41 +287,189 @@ RESPOND WITH VALID JSON ONLY (no markdown, no code blocks):
 
 Respond now with JSON:"""
 
+    token_estimates = {name: estimate_tokens(text) for name, text in sections.items()}
+    token_estimates["total"] = estimate_tokens(prompt)
+    print(f"Estimated prompt tokens: {json.dumps(token_estimates)}")
+
     return prompt
 
 
+@lru_cache(maxsize=1)
+def prompt_template_hash() -> str:
+    """Hash the decision prompt rendered with placeholder sections, i.e. its instructions."""
+    placeholders = {
+        name: f"<{name}>" for name in ("policy", "evidence", "entities", "document_text")
+    }
+    template = build_decision_prompt({"claim_id": "<claim_id>"}, placeholders)
+
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()
+
+
+def decision_cache_key(sections: Dict[str, str]) -> str:
+    """Hash the canonical prompt inputs, prompt template and model settings (claim ID excluded)."""
+    canonical = json.dumps(
+        {
+            "model_id": MODEL_ID,
+            "request": build_request_body(""),
+            "prompt_template": prompt_template_hash(),
+            "sections": sections,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get_cached_decision(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Return a stored decision for identical evidence, ignoring expired items."""
+    if decision_cache_table is None:
+        return None
+
+    try:
+        item = decision_cache_table.get_item(Key={"cache_key": cache_key}).get("Item")
+        if item and int(item["expires_at"]) > time.time():
+            return json.loads(item["decision_data"])
+    except Exception as e:
+        print(f"Error reading decision cache: {str(e)}")
+
+    return None
+
+
+def put_cached_decision(cache_key: str, decision_data: Dict[str, Any]) -> None:
+    """Store a model decision for reuse by identical evidence."""
+    if decision_cache_table is None or decision_data.get("decision") == "ERROR":
+        return
+
+    try:
+        decision_cache_table.put_item(
+            Item={
+                "cache_key": cache_key,
+                "model_id": MODEL_ID,
+                "decision_data": json.dumps(decision_data),
+                "created_at": datetime.now().isoformat(),
+                "expires_at": int(time.time()) + DECISION_CACHE_TTL,
+            }
+        )
+    except Exception as e:
+        print(f"Error writing decision cache: {str(e)}")
+
+
+def run_writes(writes: Dict[str, Callable[[], Any]]) -> Dict[str, float]:
+    """Run independent persistence writes concurrently and log per-write latency."""
+    timings = {}
+    errors = []
+
+    def timed(name: str, write: Callable[[], Any]) -> None:
+        start = time.perf_counter()
+        try:
+            write()
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    with ThreadPoolExecutor(max_workers=len(writes)) as executor:
+        futures = {name: executor.submit(timed, name, write) for name, write in writes.items()}
+
+    for name, future in futures.items():
+        error = future.exception()
+        if error is not None:
+            errors.append(f"{name}: {str(error)}")
+
+    timings = {name: timings.get(name) for name in writes}
+    print(f"Persistence write latency (ms): {json.dumps(timings)}")
+
+    if errors:
+        raise Exception(f"Failed to persist decision ({'; '.join(errors)})")
+
+    return timings
+
+
+def put_latest_claim(
+    claim_item: Dict[str, Any], decision_data: Dict[str, Any], entities: Dict[str, Any]
+) -> None:
+    """
+    Upsert the claim's ClaimsLatest read model unless a newer version is already stored.
+
+    The item holds only the fields the API returns, as native DynamoDB attributes,
+    so reads need no JSON parsing.
+    """
+    try:
+        claims_latest_table.put_item(
+            Item=to_dynamodb_value(
+                {
+                    "claim_id": claim_item["claim_id"],
+                    "list_pk": claims_list_pk(claim_item["timestamp"]),
+                    "version": claim_item["version"],
+                    "status": claim_item["status"],
+                    "timestamp": claim_item["timestamp"],
+                    "decision": decision_data.get("decision"),
+                    "reasoning": decision_data.get("reasoning"),
+                    "confidence": decision_data.get("confidence"),
+                    "estimated_payout": decision_data.get("estimated_payout"),
+                    "entities": entities or {},
+                }
+            ),
+            ConditionExpression="attribute_not_exists(claim_id) OR #ts <= :ts",
+            ExpressionAttributeNames={"#ts": "timestamp"},
+            ExpressionAttributeValues={":ts": claim_item["timestamp"]},
+        )
+    except claims_latest_table.meta.client.exceptions.ConditionalCheckFailedException:
+        print(f"Newer version of {claim_item['claim_id']} already in ClaimsLatest")
+
+
 def lambda_handler(event, context):
     """Lambda handler for Decision Agent."""
+    audit = new_audit_writer()
+
     try:
         print(f"Event: {json.dumps(event)}")
 
         claim_id = event.get("claim_id")
         bucket_prefix = os.environ.get("BUCKET_PREFIX", "claimvoyant")
 
-        # Build decision prompt
-        prompt = build_decision_prompt(event)
+        # Load the claim state the prompt and records need from the claim context
+        context = ClaimContext.from_event(event)
+        claim = {"claim_id": claim_id, **context.get_many(DECISION_CONTEXT_SECTIONS)}
 
-        print(f"Making decision for claim {claim_id}")
+        # Identical evidence (re-driven executions, duplicate uploads) reuses the stored decision
+        sections = build_prompt_sections(claim)
+        cache_key = decision_cache_key(sections)
+        decision_data = get_cached_decision(cache_key)
+        cache_hit = decision_data is not None
 
-        # Invoke Claude for decision
-        decision_data = invoke_claude(prompt)
+        if cache_hit:
+            print(f"Decision cache hit for claim {claim_id} ({cache_key})")
+        else:
+            # Build decision prompt
+            prompt = build_decision_prompt(claim, sections)
+
+            print(f"Making decision for claim {claim_id}")
+
+            # Invoke Claude for decision
+            decision_data = invoke_claude(prompt)
+            put_cached_decision(cache_key, decision_data)
 
         print(f"Decision: {decision_data.get('decision')}")
 
         # Store decision in DynamoDB with versioning
         version = datetime.now().isoformat()
-        claims_table.put_item(
-            Item={
-                "claim_id": claim_id,
-                "version": version,
-                "status": decision_data.get("decision", "ERROR"),
-                "decision_data": json.dumps(decision_data),
-                "policy_data": json.dumps(event.get("policy_data", {})),
-                "extracted_data": json.dumps(event.get("extracted_data", {})),
-                "entities": json.dumps(event.get("entities", {})),
-                "timestamp": version,
-            }
-        )
+        extraction_ref = {
+            "bucket": f"{bucket_prefix}-reports",
+            "key": f"{claim_id}/extracted_data/{version}.json",
+        }
+        claim_item = {
+            "claim_id": claim_id,
+            "version": version,
+            "status": decision_data.get("decision", "ERROR"),
+            "decision_data": json.dumps(decision_data),
+            "policy_data": json.dumps(claim.get("policy_data") or {}),
+            "extracted_data": json.dumps(
+                summarize_extracted_data(claim.get("extracted_data") or {})
+            ),
+            "entities": json.dumps(claim.get("entities") or {}),
+            "extracted_data_ref": json.dumps(extraction_ref),
+            "timestamp": version,
+        }
 
         # Save decision report to S3
         report = {
@@ -142,39 +482,59 @@ def lambda_handler(event, context):
             "deductible_applies": decision_data.get("deductible_applies"),
             "required_actions": decision_data.get("required_actions", []),
             "risk_factors": decision_data.get("risk_factors", []),
-            "policy_data": event.get("policy_data"),
-            "entities": event.get("entities"),
+            "policy_data": claim.get("policy_data"),
+            "entities": claim.get("entities"),
         }
-
         report_key = f"{claim_id}/final_decision.json"
-        s3.put_object(
-            Bucket=f"{bucket_prefix}-reports",
-            Key=report_key,
-            Body=json.dumps(report, indent=2),
-            ContentType="application/json",
-        )
-
-        print(f"Saved decision report to s3://{bucket_prefix}-reports/{report_key}")
 
         # Log to DynamoDB AuditLog
         log_id = f"{claim_id}-decision"
-        audit_log_table.put_item(
-            Item={
-                "log_id": log_id,
-                "timestamp": version,
-                "claim_id": claim_id,
-                "agent": "decision",
-                "action": "make_decision",
-                "status": "success",
-                "details": json.dumps(
-                    {
-                        "decision": decision_data.get("decision"),
-                        "confidence": decision_data.get("confidence"),
-                    }
+        audit_item = {
+            "log_id": log_id,
+            "timestamp": version,
+            "claim_id": claim_id,
+            "agent": "decision",
+            "action": "make_decision",
+            "status": "success",
+            "details": json.dumps(
+                {
+                    "decision": decision_data.get("decision"),
+                    "confidence": decision_data.get("confidence"),
+                    "cache_hit": cache_hit,
+                }
+            ),
+        }
+
+        audit.put(audit_item)
+
+        # The Claims, ClaimsLatest and report writes are independent, so issue them concurrently
+        run_writes(
+            {
+                "claims_table": partial(claims_table.put_item, Item=claim_item),
+                "claims_latest": partial(
+                    put_latest_claim, claim_item, decision_data, claim.get("entities") or {}
+                ),
+                "report": partial(
+                    s3.put_object,
+                    Bucket=f"{bucket_prefix}-reports",
+                    Key=report_key,
+                    Body=json.dumps(report, indent=2),
+                    ContentType="application/json",
+                ),
+                "extraction": partial(
+                    s3.put_object,
+                    Bucket=extraction_ref["bucket"],
+                    Key=extraction_ref["key"],
+                    Body=json.dumps(claim.get("extracted_data") or {}, default=str),
+                    ContentType="application/json",
                 ),
             }
         )
 
+        print(f"Saved decision report to s3://{bucket_prefix}-reports/{report_key}")
+
+        audit.flush()
+
         # Return result
         return {
             "statusCode": 200,
@@ -182,6 +542,7 @@ def lambda_handler(event, context):
             "version": version,
             "decision": decision_data.get("decision"),
             "decision_data": decision_data,
+            "cache_hit": cache_hit,
             "report_s3_key": report_key,
         }
 
@@ -192,3 +553,6 @@ def lambda_handler(event, context):
         traceback.print_exc()
 
         return {"statusCode": 500, "claim_id": event.get("claim_id"), "error": str(e)}
+
+    finally:
+        audit.close()
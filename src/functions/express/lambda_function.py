@@ -0,0 +1,31 @@
+"""
+Express Pipeline Lambda Function
+
+Runs the whole claim workflow (intake, policy/damage/valuation, decision) in one
+invocation for low-latency claims, instead of through Step Functions.
+"""
+
+import json
+
+from shared.pipeline import run_pipeline
+
+
+def lambda_handler(event, context):
+    """
+    Lambda handler for the express pipeline.
+
+    Invoked asynchronously, so failures are re-raised: Lambda retries the event
+    and then sends it to the function's on-failure destination.
+    """
+    try:
+        print(f"Event: {json.dumps(event)}")
+
+        return run_pipeline(event)
+
+    except Exception as e:
+        print(f"Error in Express Pipeline: {str(e)}")
+        import traceback
+
+        traceback.print_exc()
+
+        raise
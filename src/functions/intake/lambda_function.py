@@ -7,93 +7,220 @@ Stores extracted data in Weaviate ClaimArtifacts collection and DynamoDB AuditLo
 
 import json
 import os
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote_plus
 
 import boto3
 
+from shared.audit import AuditWriter, new_audit_writer
+from shared.clients import batch_insert, get_weaviate_client, reset_weaviate_client
+from shared.context import ClaimContext
+from shared.ids import new_claim_id
+
 # AWS clients
 s3 = boto3.client("s3")
 textract = boto3.client("textract")
 rekognition = boto3.client("rekognition")
-dynamodb = boto3.resource("dynamodb")
 secrets_manager = boto3.client("secretsmanager")
+stepfunctions = boto3.client("stepfunctions")
+
+# Environment variables
+BUCKET_PREFIX = os.environ.get("BUCKET_PREFIX", "claimvoyant")
+
+# Textract completion mode: "poll" waits for the job inside this invocation (local runs
+# against a stub), "sns" returns immediately and resumes in textract_completion_handler
+# once Textract publishes the job status to the SNS topic.
+TEXTRACT_COMPLETION_MODE = os.environ.get("TEXTRACT_COMPLETION_MODE", "poll")
+TEXTRACT_SNS_TOPIC_ARN = os.environ.get("TEXTRACT_SNS_TOPIC_ARN", "")
+TEXTRACT_SNS_ROLE_ARN = os.environ.get("TEXTRACT_SNS_ROLE_ARN", "")
+TEXTRACT_JOBS_PREFIX = "textract-jobs"
+
+# Upper bound on S3 records processed concurrently in one invocation
+INTAKE_MAX_WORKERS = int(os.environ.get("INTAKE_MAX_WORKERS", "8"))
+
+# Upper bound on in-flight Rekognition calls, shared by every image in the invocation
+REKOGNITION_MAX_CONCURRENCY = int(os.environ.get("REKOGNITION_MAX_CONCURRENCY", "8"))
+rekognition_executor = ThreadPoolExecutor(max_workers=REKOGNITION_MAX_CONCURRENCY)
+
+
+def use_sns_completion() -> bool:
+    """Return True when Textract jobs should report completion through SNS."""
+    return (
+        TEXTRACT_COMPLETION_MODE == "sns"
+        and bool(TEXTRACT_SNS_TOPIC_ARN)
+        and bool(TEXTRACT_SNS_ROLE_ARN)
+    )
+
+
+def start_text_detection(
+    bucket: str, key: str, job_tag: Optional[str] = None, notify: bool = False
+) -> str:
+    """
+    Start an asynchronous Textract text detection job and return its job ID.
+
+    Only jobs started with notify=True (those with a saved pending job) publish
+    their completion to SNS; polled jobs would reach the handler unmatched.
+    """
+    params = {"DocumentLocation": {"S3Object": {"Bucket": bucket, "Name": key}}}
+
+    if notify and use_sns_completion():
+        params["NotificationChannel"] = {
+            "SNSTopicArn": TEXTRACT_SNS_TOPIC_ARN,
+            "RoleArn": TEXTRACT_SNS_ROLE_ARN,
+        }
+        if job_tag:
+            params["JobTag"] = job_tag
 
-# DynamoDB table
-audit_log_table = dynamodb.Table("AuditLog")
+    response = textract.start_document_text_detection(**params)
 
+    job_id = response["JobId"]
+    print(f"Started Textract job: {job_id}")
 
-def get_weaviate_client():
-    """Initialize Weaviate client with credentials from Secrets Manager."""
-    try:
-        import weaviate
-        from weaviate.classes.init import Auth
+    return job_id
 
-        secret_response = secrets_manager.get_secret_value(SecretId="claimvoyant/weaviate")
-        secret_data = json.loads(secret_response["SecretString"])
 
-        client = weaviate.connect_to_weaviate_cloud(
-            cluster_url=secret_data["url"],
-            auth_credentials=Auth.api_key(secret_data["api_key"]),
-        )
+# Largest page size accepted by GetDocumentTextDetection
+TEXTRACT_PAGE_SIZE = 1000
 
-        return client
-    except Exception as e:
-        print(f"Error connecting to Weaviate: {str(e)}")
-        raise
 
+def iter_text_detection_lines(
+    job_id: str, first_page: Optional[Dict[str, Any]] = None
+) -> Iterator[str]:
+    """Yield LINE text from every result page of a finished Textract job, following NextToken."""
+    page = first_page or textract.get_document_text_detection(
+        JobId=job_id, MaxResults=TEXTRACT_PAGE_SIZE
+    )
 
-def extract_text_from_pdf(bucket: str, key: str) -> Dict[str, Any]:
-    """Extract text from PDF using AWS Textract."""
-    try:
-        # Start asynchronous text detection
-        response = textract.start_document_text_detection(
-            DocumentLocation={"S3Object": {"Bucket": bucket, "Name": key}}
+    status = page["JobStatus"]
+    if status != "SUCCEEDED":
+        raise Exception(f"Textract job {status.lower()}: {page.get('StatusMessage')}")
+
+    while True:
+        for block in page.get("Blocks", []):
+            if block["BlockType"] == "LINE":
+                yield block.get("Text", "")
+
+        next_token = page.get("NextToken")
+        if not next_token:
+            return
+
+        page = textract.get_document_text_detection(
+            JobId=job_id, MaxResults=TEXTRACT_PAGE_SIZE, NextToken=next_token
         )
 
-        job_id = response["JobId"]
-        print(f"Started Textract job: {job_id}")
 
-        # Wait for job completion (simplified - in production use Step Functions)
-        import time
+def get_text_detection_result(
+    job_id: str, first_page: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Collect the LINE text of a finished Textract job."""
+    extracted_text = "\n".join(iter_text_detection_lines(job_id, first_page))
 
-        while True:
-            result = textract.get_document_text_detection(JobId=job_id)
-            status = result["JobStatus"]
+    return {"text": extracted_text.strip(), "job_id": job_id}
 
-            if status == "SUCCEEDED":
-                # Extract all text blocks
-                blocks = result.get("Blocks", [])
-                extracted_text = ""
 
-                for block in blocks:
-                    if block["BlockType"] == "LINE":
-                        extracted_text += block.get("Text", "") + "\n"
+def wait_for_text_detection(job_id: str) -> Dict[str, Any]:
+    """Poll a Textract job until it finishes (fallback when SNS completion is disabled)."""
+    while True:
+        result = textract.get_document_text_detection(JobId=job_id, MaxResults=TEXTRACT_PAGE_SIZE)
+        status = result["JobStatus"]
+
+        if status == "SUCCEEDED":
+            # Reuse the first result page rather than fetching it again
+            return get_text_detection_result(job_id, first_page=result)
+
+        elif status == "FAILED":
+            raise Exception(f"Textract job failed: {result.get('StatusMessage')}")
 
-                return {"text": extracted_text.strip(), "job_id": job_id}
+        time.sleep(2)  # Poll every 2 seconds
 
-            elif status == "FAILED":
-                raise Exception(f"Textract job failed: {result.get('StatusMessage')}")
 
-            time.sleep(2)  # Poll every 2 seconds
+def extract_text_from_pdf(bucket: str, key: str) -> Dict[str, Any]:
+    """Extract text from PDF using AWS Textract."""
+    try:
+        job_id = start_text_detection(bucket, key)
+        return wait_for_text_detection(job_id)
 
     except Exception as e:
         print(f"Error extracting text from PDF: {str(e)}")
         return {"text": "", "error": str(e)}
 
 
-def analyze_image(bucket: str, key: str) -> Dict[str, Any]:
-    """Analyze image using AWS Rekognition."""
+def save_pending_job(job_id: str, job: Dict[str, Any]) -> None:
+    """Persist claim context for a Textract job so the completion handler can resume it."""
+    s3.put_object(
+        Bucket=f"{BUCKET_PREFIX}-processed",
+        Key=f"{TEXTRACT_JOBS_PREFIX}/{job_id}.json",
+        Body=json.dumps(job),
+        ContentType="application/json",
+    )
+
+
+def load_pending_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Load the claim context saved when a Textract job was started, or None if there is none."""
     try:
-        # Detect labels (vehicle damage, accident scenes, etc.)
-        label_response = rekognition.detect_labels(
-            Image={"S3Object": {"Bucket": bucket, "Name": key}},
-            MaxLabels=10,
-            MinConfidence=70,
+        obj = s3.get_object(
+            Bucket=f"{BUCKET_PREFIX}-processed", Key=f"{TEXTRACT_JOBS_PREFIX}/{job_id}.json"
+        )
+    except s3.exceptions.NoSuchKey:
+        return None
+    return json.loads(obj["Body"].read())
+
+
+def delete_pending_job(job_id: str) -> None:
+    """Remove a Textract job's saved context once its waiting task has been resumed."""
+    s3.delete_object(
+        Bucket=f"{BUCKET_PREFIX}-processed", Key=f"{TEXTRACT_JOBS_PREFIX}/{job_id}.json"
+    )
+
+
+def send_task_result(task_token: Optional[str], result: Dict[str, Any]) -> None:
+    """Resume a Step Functions task waiting on a callback token with the intake result."""
+    if not task_token:
+        return
+
+    if result.get("statusCode") == 200:
+        stepfunctions.send_task_success(taskToken=task_token, output=json.dumps(result))
+    else:
+        stepfunctions.send_task_failure(
+            taskToken=task_token,
+            error="IntakeFailed",
+            cause=str(result.get("error", "Unknown error"))[:32768],
         )
 
-        # Detect text in image
-        text_response = rekognition.detect_text(Image={"S3Object": {"Bucket": bucket, "Name": key}})
+
+def timed_call(fn: Callable[..., Dict[str, Any]], **kwargs) -> Tuple[Dict[str, Any], float]:
+    """Call an AWS API and return its response with the call latency in milliseconds."""
+    start = time.perf_counter()
+    response = fn(**kwargs)
+    return response, round((time.perf_counter() - start) * 1000, 1)
+
+
+def submit_image_analysis(bucket: str, key: str) -> Tuple[Future, Future]:
+    """Start the independent detect_labels and detect_text calls for one image."""
+    image = {"S3Object": {"Bucket": bucket, "Name": key}}
+
+    # Detect labels (vehicle damage, accident scenes, etc.)
+    labels_future = rekognition_executor.submit(
+        timed_call, rekognition.detect_labels, Image=image, MaxLabels=10, MinConfidence=70
+    )
+
+    # Detect text in image
+    text_future = rekognition_executor.submit(timed_call, rekognition.detect_text, Image=image)
+
+    return labels_future, text_future
+
+
+def collect_image_analysis(futures: Tuple[Future, Future]) -> Dict[str, Any]:
+    """Wait for one image's Rekognition calls and build its analysis."""
+    labels_future, text_future = futures
+
+    try:
+        label_response, labels_ms = labels_future.result()
+        text_response, text_ms = text_future.result()
 
         labels = [
             {"name": label["Name"], "confidence": label["Confidence"]}
@@ -108,13 +235,91 @@ def analyze_image(bucket: str, key: str) -> Dict[str, Any]:
             ]
         )
 
-        return {"labels": labels, "detected_text": detected_text}
+        return {
+            "labels": labels,
+            "detected_text": detected_text,
+            "latency_ms": {"detect_labels": labels_ms, "detect_text": text_ms},
+        }
 
     except Exception as e:
         print(f"Error analyzing image: {str(e)}")
         return {"labels": [], "detected_text": "", "error": str(e)}
 
 
+def analyze_image(bucket: str, key: str) -> Dict[str, Any]:
+    """Analyze image using AWS Rekognition."""
+    return collect_image_analysis(submit_image_analysis(bucket, key))
+
+
+def merge_labels(images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge labels across images, keeping each label's highest confidence."""
+    labels: Dict[str, float] = {}
+    for image in images:
+        for label in image.get("labels", []):
+            labels[label["name"]] = max(labels.get(label["name"], 0), label["confidence"])
+
+    return [
+        {"name": name, "confidence": confidence}
+        for name, confidence in sorted(labels.items(), key=lambda item: -item[1])
+    ]
+
+
+def analyze_images(bucket: str, keys: List[str]) -> Dict[str, Any]:
+    """
+    Analyze a claim's photo set with all Rekognition calls in flight at once.
+
+    Concurrency is bounded by rekognition_executor. Labels are merged across
+    images (highest confidence per label) and detected text is concatenated.
+    """
+    start = time.perf_counter()
+
+    submitted = [(key, submit_image_analysis(bucket, key)) for key in keys]
+    images = [{"key": key, **collect_image_analysis(futures)} for key, futures in submitted]
+
+    analysis = {
+        "labels": merge_labels(images),
+        "detected_text": " ".join(
+            image["detected_text"] for image in images if image["detected_text"]
+        ),
+        "images": images,
+        "analysis_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+    errors = [f"{image['key']}: {image['error']}" for image in images if image.get("error")]
+    if errors:
+        analysis["error"] = "; ".join(errors)
+
+    print(
+        f"Analyzed {len(images)} images in {analysis['analysis_ms']} ms, "
+        f"per-call latency: {json.dumps({image['key']: image.get('latency_ms') for image in images})}"
+    )
+
+    return analysis
+
+
+# Extraction type by file extension
+FILE_TYPES = {"pdf": "pdf", "jpg": "image", "jpeg": "image", "png": "image"}
+
+# Entity sources in order of trust when a claim's documents disagree
+ENTITY_SOURCE_PRIORITY = {"pdf": 0, "image": 1}
+
+# Entity patterns scanned in a single pass over the text (in production, use NER or LLM).
+# Each kind becomes a named group of ENTITY_SCANNER and keeps its whole match.
+ENTITY_PATTERNS = {
+    # Policy number (e.g., AUTO-001, POL-123456, "Policy: AB-123")
+    "policy_number": r"(?i:AUTO-\d+|POL-\d+|POLICY[:\s]+\w+-?\d+)",
+    # Date (e.g., 2025-10-22, 10/22/2025)
+    "incident_date": r"\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4}",
+}
+
+# The zero-width lookahead is tried at every position, so each kind's first match is
+# the same one a separate re.search per pattern would find, including matches inside
+# a word (e.g. "MYPOL-123")
+ENTITY_SCANNER = re.compile(
+    "(?=" + "|".join(f"(?P<{kind}>{pattern})" for kind, pattern in ENTITY_PATTERNS.items()) + ")"
+)
+
+
 def extract_entities(text: str) -> Dict[str, Any]:
     """Extract claim entities from text using simple pattern matching."""
     entities = {
@@ -125,124 +330,469 @@ def extract_entities(text: str) -> Dict[str, Any]:
         "vehicle_info": None,
     }
 
-    # Simple pattern matching (in production, use NER or LLM)
-    import re
+    # Keep the first match of each kind and stop once every kind has been found
+    remaining = len(ENTITY_PATTERNS)
+    for match in ENTITY_SCANNER.finditer(text):
+        kind = match.lastgroup
+        if kind is None or entities[kind] is not None:
+            continue
 
-    # Policy number pattern (e.g., AUTO-001, POL-123456)
-    policy_match = re.search(r"(AUTO-\d+|POL-\d+|POLICY[:\s]+(\w+-?\d+))", text, re.I)
-    if policy_match:
-        entities["policy_number"] = policy_match.group(1)
+        entities[kind] = match.group(kind)
 
-    # Date pattern (e.g., 2025-10-22, 10/22/2025)
-    date_match = re.search(r"(\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4})", text)
-    if date_match:
-        entities["incident_date"] = date_match.group(1)
+        remaining -= 1
+        if not remaining:
+            break
 
     return entities
 
 
-def lambda_handler(event, context):
-    """Lambda handler for Intake Agent."""
+def store_artifacts(artifacts: List[Dict[str, Any]]) -> None:
+    """Store artifacts in the Weaviate ClaimArtifacts collection, batching multiple objects."""
+    if not artifacts:
+        return
+
     try:
-        # Extract S3 event details
-        print(f"Event: {json.dumps(event)}")
-
-        # Handle S3 event or direct invocation
-        if "Records" in event:
-            # S3 event trigger
-            bucket = event["Records"][0]["s3"]["bucket"]["name"]
-            key = event["Records"][0]["s3"]["object"]["key"]
+        weaviate_client = get_weaviate_client(secrets_manager)
+        collection = weaviate_client.collections.get("ClaimArtifacts")
+
+        if len(artifacts) == 1:
+            collection.data.insert(properties=artifacts[0])
+            failed = 0
         else:
-            # Direct invocation (for testing or Step Functions)
-            bucket = event.get("bucket")
-            key = event.get("key")
+            failed = batch_insert(collection, artifacts)["failed"]
 
-        if not bucket or not key:
-            raise ValueError("Missing bucket or key in event")
+        print(f"Stored {len(artifacts) - failed} of {len(artifacts)} artifacts in Weaviate")
+
+    except Exception as e:
+        print(f"Error storing in Weaviate: {str(e)}")
+        reset_weaviate_client()
+        # Continue processing even if Weaviate fails
+
+
+def extraction_text(extracted_data: Dict[str, Any]) -> str:
+    """Return the document and image text entities are extracted from."""
+    return extracted_data.get("text", "") + " " + extracted_data.get("detected_text", "")
+
+
+def build_artifact(
+    claim_id: str,
+    bucket: str,
+    key: str,
+    extracted_data: Dict[str, Any],
+    entities: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Build a ClaimArtifacts object for one extracted S3 object."""
+    return {
+        "claim_id": claim_id,
+        "s3_bucket": bucket,
+        "s3_key": key,
+        "file_type": extracted_data.get("file_type", "unknown"),
+        "extracted_text": extraction_text(extracted_data)[:50000],  # Limit text length
+        "entities": json.dumps(entities),
+        "metadata": json.dumps(extracted_data),
+    }
 
-        # Generate claim ID
-        claim_id = event.get("claim_id") or f"CLAIM-{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
-        print(f"Processing claim {claim_id}: s3://{bucket}/{key}")
+def record_intake(
+    claim_id: str,
+    bucket: str,
+    key: str,
+    extracted_data: Dict[str, Any],
+    entities: Dict[str, Any],
+    audit: AuditWriter,
+) -> Dict[str, Any]:
+    """
+    Audit the extraction, write it to the claim context and build the intake result.
+
+    Only the claim-context reference is returned, not the extracted data.
+    """
+    # Log to DynamoDB AuditLog
+    log_id = f"{claim_id}-intake"
+    audit.put(
+        {
+            "log_id": log_id,
+            "timestamp": datetime.now().isoformat(),
+            "claim_id": claim_id,
+            "agent": "intake",
+            "action": "extract_data",
+            "status": "success" if not extracted_data.get("error") else "error",
+            "details": json.dumps(
+                {
+                    "bucket": bucket,
+                    "key": key,
+                    "file_type": extracted_data.get("file_type"),
+                    "entities": entities,
+                }
+            ),
+        }
+    )
+
+    # Downstream agents load these from the claim context instead of the state payload
+    context = ClaimContext.create(claim_id)
+    context.put("extracted_data", extracted_data)
+    context.put("entities", entities)
+
+    # Return result for Step Functions
+    result = {
+        "statusCode": 200,
+        "claim_id": claim_id,
+        "bucket": bucket,
+        "key": key,
+        "context_ref": context.reference(),
+    }
 
-        # Determine file type
-        file_extension = key.lower().split(".")[-1]
-        extracted_data = {}
+    # Textract/Rekognition errors are worth retrying; unsupported file types are not
+    if extracted_data.get("error") and extracted_data.get("file_type") != "unknown":
+        result["extraction_error"] = extracted_data["error"]
+
+    return result
+
+
+def process_extraction(
+    claim_id: str,
+    bucket: str,
+    key: str,
+    extracted_data: Dict[str, Any],
+    audit: AuditWriter,
+    pending_artifacts: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Extract entities, store the artifact and build the intake result for Step Functions.
+
+    When pending_artifacts is given, the artifact is appended to it for a later
+    batched store_artifacts() call instead of being inserted immediately.
+    """
+    # Extract entities from text
+    entities = extract_entities(extraction_text(extracted_data))
+
+    # Store in Weaviate ClaimArtifacts collection
+    artifact = build_artifact(claim_id, bucket, key, extracted_data, entities)
+
+    if pending_artifacts is not None:
+        pending_artifacts.append(artifact)
+    else:
+        store_artifacts([artifact])
+
+    return record_intake(claim_id, bucket, key, extracted_data, entities, audit)
+
+
+def process_object(
+    bucket: str,
+    key: str,
+    claim_id: str,
+    audit: AuditWriter,
+    task_token: Optional[str] = None,
+    pending_artifacts: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Run extraction for a single S3 object and return the intake result."""
+    print(f"Processing claim {claim_id}: s3://{bucket}/{key}")
+
+    # Determine file type
+    file_extension = key.lower().split(".")[-1]
+    extracted_data = {}
+
+    if file_extension == "pdf" and task_token and use_sns_completion():
+        # Hand off to textract_completion_handler instead of waiting on the job; only
+        # callers holding a task token can be resumed, everyone else polls
+        job_id = start_text_detection(bucket, key, job_tag=claim_id, notify=True)
+        save_pending_job(
+            job_id,
+            {"claim_id": claim_id, "bucket": bucket, "key": key, "task_token": task_token},
+        )
 
-        if file_extension == "pdf":
-            # Extract text from PDF using Textract
-            extracted_data = extract_text_from_pdf(bucket, key)
-            extracted_data["file_type"] = "pdf"
-        elif file_extension in ["jpg", "jpeg", "png"]:
-            # Analyze image using Rekognition
-            extracted_data = analyze_image(bucket, key)
-            extracted_data["file_type"] = "image"
-        else:
-            extracted_data = {
-                "file_type": "unknown",
-                "error": f"Unsupported file type: {file_extension}",
+        print(f"Claim {claim_id} waiting on Textract job {job_id}")
+
+        return {
+            "statusCode": 202,
+            "claim_id": claim_id,
+            "bucket": bucket,
+            "key": key,
+            "textract_job_id": job_id,
+        }
+
+    elif file_extension == "pdf":
+        # Extract text from PDF using Textract
+        extracted_data = extract_text_from_pdf(bucket, key)
+        extracted_data["file_type"] = "pdf"
+    elif file_extension in ["jpg", "jpeg", "png"]:
+        # Analyze image using Rekognition
+        extracted_data = analyze_image(bucket, key)
+        extracted_data["file_type"] = "image"
+    else:
+        extracted_data = {
+            "file_type": "unknown",
+            "error": f"Unsupported file type: {file_extension}",
+        }
+
+    return process_extraction(claim_id, bucket, key, extracted_data, audit, pending_artifacts)
+
+
+def list_claim_objects(bucket: str, prefix: str) -> List[str]:
+    """List the object keys uploaded under a claim prefix."""
+    keys = []
+    paginator = s3.get_paginator("list_objects_v2")
+
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        keys.extend(obj["Key"] for obj in page.get("Contents", []) if not obj["Key"].endswith("/"))
+
+    return sorted(keys)
+
+
+def extract_documents(bucket: str, keys: List[str]) -> List[Dict[str, Any]]:
+    """
+    Extract every document of a claim in parallel.
+
+    PDFs run as concurrent Textract jobs while the photos go through
+    analyze_images. Each returned document carries its key, file_type and
+    extracted fields, in the order of keys.
+    """
+    file_types = {key: FILE_TYPES.get(key.lower().rsplit(".", 1)[-1], "unknown") for key in keys}
+    pdf_keys = [key for key in keys if file_types[key] == "pdf"]
+    image_keys = [key for key in keys if file_types[key] == "image"]
+
+    documents: Dict[str, Dict[str, Any]] = {}
+    max_workers = max(1, min(INTAKE_MAX_WORKERS, len(pdf_keys)))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pdf_futures = {key: executor.submit(extract_text_from_pdf, bucket, key) for key in pdf_keys}
+
+        if image_keys:
+            for image in analyze_images(bucket, image_keys)["images"]:
+                documents[image["key"]] = {"file_type": "image", **image}
+
+        for key, future in pdf_futures.items():
+            documents[key] = {"key": key, "file_type": "pdf", **future.result()}
+
+    for key in keys:
+        if file_types[key] == "unknown":
+            documents[key] = {"key": key, "file_type": "unknown", "error": "Unsupported file type"}
+
+    return [documents[key] for key in keys]
+
+
+def merge_entities(documents: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Merge per-document entities into one set for the claim.
+
+    When documents disagree, values from PDFs win over photo OCR, then the value
+    found in the most documents, then the first one found. Every disagreement is
+    returned as a conflict listing each value and its source keys.
+    """
+    candidates: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    for document in documents:
+        priority = ENTITY_SOURCE_PRIORITY.get(document["file_type"], len(ENTITY_SOURCE_PRIORITY))
+
+        for kind, value in document["entities"].items():
+            if value is None:
+                continue
+
+            candidate = candidates.setdefault(kind, {}).setdefault(
+                str(value).strip().upper(), {"value": value, "priority": priority, "sources": []}
+            )
+            candidate["priority"] = min(candidate["priority"], priority)
+            candidate["sources"].append(document["key"])
+
+    # Start from the full (empty) entity set so every kind is present
+    entities = extract_entities("")
+    conflicts = {}
+
+    for kind, values in candidates.items():
+        ranked = sorted(values.values(), key=lambda c: (c["priority"], -len(c["sources"])))
+        entities[kind] = ranked[0]["value"]
+
+        if len(ranked) > 1:
+            conflicts[kind] = [{"value": c["value"], "sources": c["sources"]} for c in ranked]
+
+    return entities, conflicts
+
+
+def process_claim_prefix(
+    bucket: str, prefix: str, claim_id: str, audit: AuditWriter
+) -> Dict[str, Any]:
+    """
+    Run extraction for every object under a claim prefix and return one intake result.
+
+    Each document is stored as its own artifact, and the downstream agents get
+    one consolidated extracted_data with merged entities.
+    """
+    keys = list_claim_objects(bucket, prefix)
+    if not keys:
+        raise ValueError(f"No objects found under s3://{bucket}/{prefix}")
+
+    print(f"Processing claim {claim_id}: {len(keys)} documents in s3://{bucket}/{prefix}")
+
+    documents = extract_documents(bucket, keys)
+    for document in documents:
+        document["entities"] = extract_entities(extraction_text(document))
+
+    entities, conflicts = merge_entities(documents)
+    if conflicts:
+        print(f"Resolved entity conflicts for claim {claim_id}: {json.dumps(conflicts)}")
+
+    pdfs = [document for document in documents if document["file_type"] == "pdf"]
+    images = [document for document in documents if document["file_type"] == "image"]
+
+    extracted_data = {
+        "file_type": "claim",
+        "text": "\n\n".join(f"[{doc['key']}]\n{doc['text']}" for doc in pdfs if doc.get("text")),
+        "labels": merge_labels(images),
+        "detected_text": " ".join(
+            image["detected_text"] for image in images if image.get("detected_text")
+        ),
+        "documents": [
+            {
+                k: document.get(k)
+                for k in ("key", "file_type", "entities", "error")
+                if document.get(k)
             }
+            for document in documents
+        ],
+        "entity_conflicts": conflicts,
+    }
 
-        # Extract entities from text
-        text_content = (
-            extracted_data.get("text", "") + " " + extracted_data.get("detected_text", "")
-        )
-        entities = extract_entities(text_content)
+    errors = [
+        f"{document['key']}: {document['error']}" for document in documents if document.get("error")
+    ]
+    if errors:
+        extracted_data["error"] = "; ".join(errors)
 
-        # Store in Weaviate ClaimArtifacts collection
-        try:
-            weaviate_client = get_weaviate_client()
-            artifacts = weaviate_client.collections.get("ClaimArtifacts")
-
-            artifacts.data.insert(
-                properties={
-                    "claim_id": claim_id,
-                    "s3_bucket": bucket,
-                    "s3_key": key,
-                    "file_type": extracted_data.get("file_type", "unknown"),
-                    "extracted_text": text_content[:50000],  # Limit text length
-                    "entities": json.dumps(entities),
-                    "metadata": json.dumps(extracted_data),
+    store_artifacts(
+        [
+            build_artifact(claim_id, bucket, document["key"], document, document["entities"])
+            for document in documents
+        ]
+    )
+
+    return record_intake(claim_id, bucket, prefix, extracted_data, entities, audit)
+
+
+def get_s3_objects(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flatten S3 notification records (direct or wrapped in SQS messages) into objects."""
+    objects = []
+
+    for record in records:
+        if record.get("eventSource") == "aws:sqs":
+            # SQS message carrying an S3 notification; retried per message
+            body = json.loads(record["body"])
+            for s3_record in body.get("Records", []):
+                objects.append(
+                    {
+                        "item_id": record["messageId"],
+                        "bucket": s3_record["s3"]["bucket"]["name"],
+                        "key": unquote_plus(s3_record["s3"]["object"]["key"]),
+                    }
+                )
+        else:
+            # Direct S3 notification; retried as a whole invocation
+            objects.append(
+                {
+                    "item_id": None,
+                    "bucket": record["s3"]["bucket"]["name"],
+                    "key": unquote_plus(record["s3"]["object"]["key"]),
                 }
             )
 
-            weaviate_client.close()
-            print(f"Stored claim {claim_id} in Weaviate")
+    return objects
+
 
+def process_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Process every S3 object in a batch concurrently.
+
+    Failed SQS messages are reported as batchItemFailures so only they are
+    redelivered. Direct S3 notifications have no partial-batch retry, so any
+    failure among them raises and Lambda retries the invocation.
+    """
+    objects = get_s3_objects(records)
+    artifacts = []
+    audit = new_audit_writer()
+
+    def process(obj: Dict[str, Any]) -> Dict[str, Any]:
+        claim_id = new_claim_id()
+        try:
+            return process_object(
+                obj["bucket"], obj["key"], claim_id, audit, pending_artifacts=artifacts
+            )
         except Exception as e:
-            print(f"Error storing in Weaviate: {str(e)}")
-            # Continue processing even if Weaviate fails
-
-        # Log to DynamoDB AuditLog
-        log_id = f"{claim_id}-intake"
-        audit_log_table.put_item(
-            Item={
-                "log_id": log_id,
-                "timestamp": datetime.now().isoformat(),
-                "claim_id": claim_id,
-                "agent": "intake",
-                "action": "extract_data",
-                "status": "success" if not extracted_data.get("error") else "error",
-                "details": json.dumps(
-                    {
-                        "bucket": bucket,
-                        "key": key,
-                        "file_type": extracted_data.get("file_type"),
-                        "entities": entities,
-                    }
-                ),
-            }
-        )
+            print(f"Error processing s3://{obj['bucket']}/{obj['key']}: {str(e)}")
+            import traceback
 
-        # Return result for Step Functions
-        return {
-            "statusCode": 200,
-            "claim_id": claim_id,
-            "bucket": bucket,
-            "key": key,
-            "extracted_data": extracted_data,
-            "entities": entities,
-        }
+            traceback.print_exc()
+
+            return {"statusCode": 500, "claim_id": claim_id, "error": str(e)}
+
+    try:
+        max_workers = max(1, min(INTAKE_MAX_WORKERS, len(objects)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(process, objects))
+
+        # One batched Weaviate write for the whole invocation
+        store_artifacts(artifacts)
+        audit.flush()
+    finally:
+        audit.close()
+
+    failed = [
+        obj
+        for obj, result in zip(objects, results)
+        if result["statusCode"] not in (200, 202) or result.get("extraction_error")
+    ]
+
+    print(f"Processed {len(objects)} objects, {len(failed)} failed")
+
+    direct_failures = [obj for obj in failed if obj["item_id"] is None]
+    if direct_failures:
+        keys = ", ".join(f"s3://{obj['bucket']}/{obj['key']}" for obj in direct_failures)
+        raise Exception(f"Intake failed for {keys}")
+
+    failed_items = list(dict.fromkeys(obj["item_id"] for obj in failed))
+
+    return {
+        "statusCode": 200 if not failed_items else 207,
+        "results": results,
+        "batchItemFailures": [{"itemIdentifier": item_id} for item_id in failed_items],
+    }
+
+
+def lambda_handler(event, context):
+    """Lambda handler for Intake Agent."""
+    task_token = event.get("task_token")
+
+    # Extract S3 event details
+    print(f"Event: {json.dumps(event)}")
+
+    if "Records" in event:
+        # S3 event trigger (possibly several uploads per invocation); errors propagate
+        # so Lambda retries the notification
+        return process_records(event["Records"])
+
+    audit = new_audit_writer()
+
+    try:
+        # Direct invocation (for testing or Step Functions)
+        bucket = event.get("bucket")
+        key = event.get("key")
+        prefix = event.get("prefix")
+
+        if not bucket or not (key or prefix):
+            raise ValueError("Missing bucket or key in event")
+
+        # Generate claim ID
+        claim_id = event.get("claim_id") or new_claim_id()
+
+        if prefix:
+            # Multi-document claim: every object under the prefix, one consolidated result
+            result = process_claim_prefix(bucket, prefix, claim_id, audit)
+        else:
+            result = process_object(bucket, key, claim_id, audit, task_token)
+        audit.flush()
+
+        # A 202 result is resumed by textract_completion_handler instead
+        if result["statusCode"] != 202:
+            send_task_result(task_token, result)
+
+        return result
 
     except Exception as e:
         print(f"Error in Intake Agent: {str(e)}")
@@ -250,4 +800,69 @@ def lambda_handler(event, context):
 
         traceback.print_exc()
 
-        return {"statusCode": 500, "error": str(e)}
+        result = {"statusCode": 500, "error": str(e)}
+        try:
+            send_task_result(task_token, result)
+        except Exception as send_error:
+            print(f"Error reporting intake failure to Step Functions: {str(send_error)}")
+
+        return result
+
+    finally:
+        audit.close()
+
+
+def textract_completion_handler(event, context):
+    """Lambda handler for Textract job completion notifications delivered via SNS."""
+    results = []
+
+    for record in event.get("Records", []):
+        message = json.loads(record["Sns"]["Message"])
+        job_id = message["JobId"]
+        status = message["Status"]
+
+        print(f"Textract job {job_id} finished with status {status}")
+
+        job = load_pending_job(job_id)
+        if job is None:
+            # Already resumed (redelivery) or not started by process_object; nothing to resume
+            print(f"No pending job saved for Textract job {job_id}, skipping")
+            continue
+
+        task_token = job.get("task_token")
+        audit = new_audit_writer()
+
+        try:
+            if status == "SUCCEEDED":
+                extracted_data = get_text_detection_result(job_id)
+            else:
+                extracted_data = {
+                    "text": "",
+                    "job_id": job_id,
+                    "error": f"Textract job {status.lower()}",
+                }
+            extracted_data["file_type"] = "pdf"
+
+            result = process_extraction(
+                job["claim_id"], job["bucket"], job["key"], extracted_data, audit
+            )
+            audit.flush()
+
+        except Exception as e:
+            print(f"Error completing Textract job {job_id}: {str(e)}")
+            import traceback
+
+            traceback.print_exc()
+
+            result = {"statusCode": 500, "claim_id": job.get("claim_id"), "error": str(e)}
+
+        finally:
+            audit.close()
+
+        # Raises if the task can't be resumed, so the notification is retried
+        # with the saved context still in place
+        send_task_result(task_token, result)
+        delete_pending_job(job_id)
+        results.append({"job_id": job_id, "statusCode": result["statusCode"]})
+
+    return {"statusCode": 200, "results": results}
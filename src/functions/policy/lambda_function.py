@@ -5,78 +5,180 @@ Queries Weaviate PolicyDocuments collection to retrieve relevant policy details
 based on the claim information.
 """
 
+import copy
 import json
 import os
+import re
+import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import boto3
 
+from shared.audit import new_audit_writer
+from shared.cache import TTLCache
+from shared.clients import get_weaviate_client, reset_weaviate_client
+from shared.context import ClaimContext
+
 # AWS clients
 dynamodb = boto3.resource("dynamodb")
 secrets_manager = boto3.client("secretsmanager")
 
-# DynamoDB table
-audit_log_table = dynamodb.Table("AuditLog")
+# Label intake keeps on labelled policy numbers (e.g. "Policy: AB-123")
+POLICY_LABEL = re.compile(r"^\s*POLICY[:\s#]+", re.IGNORECASE)
+
+# Policy cache: in-process LRU, optionally backed by a DynamoDB table (with TTL enabled on
+# "expires_at") so warm containers share lookups
+POLICY_CACHE_SIZE = int(os.environ.get("POLICY_CACHE_SIZE", "256"))
+POLICY_CACHE_TTL = int(os.environ.get("POLICY_CACHE_TTL", "900"))
+POLICY_CACHE_TABLE = os.environ.get("POLICY_CACHE_TABLE", "")
+
+policy_cache = TTLCache(maxsize=POLICY_CACHE_SIZE, ttl=POLICY_CACHE_TTL)
+policy_cache_table = dynamodb.Table(POLICY_CACHE_TABLE) if POLICY_CACHE_TABLE else None
+
+
+def normalize_policy_number(policy_number: str) -> str:
+    """Normalize a policy number for lookups and cache keys ("Policy: auto-001" -> "AUTO-001")."""
+    return "".join(POLICY_LABEL.sub("", policy_number).split()).upper()
 
 
-def get_weaviate_client():
-    """Initialize Weaviate client with credentials from Secrets Manager."""
+def get_shared_cached_policy(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Read a policy from the shared DynamoDB cache table, ignoring expired items."""
+    if policy_cache_table is None:
+        return None
+
     try:
-        import weaviate
-        from weaviate.classes.init import Auth
+        item = policy_cache_table.get_item(Key={"policy_number": cache_key}).get("Item")
+        if item and int(item["expires_at"]) > time.time():
+            return json.loads(item["policy_data"])
+    except Exception as e:
+        print(f"Error reading policy cache table: {str(e)}")
 
-        secret_response = secrets_manager.get_secret_value(SecretId="claimvoyant/weaviate")
-        secret_data = json.loads(secret_response["SecretString"])
+    return None
 
-        client = weaviate.connect_to_weaviate_cloud(
-            cluster_url=secret_data["url"],
-            auth_credentials=Auth.api_key(secret_data["api_key"]),
-        )
 
-        return client
+def put_shared_cached_policy(cache_key: str, policy_data: Dict[str, Any]) -> None:
+    """Write a policy to the shared DynamoDB cache table."""
+    if policy_cache_table is None:
+        return
+
+    try:
+        policy_cache_table.put_item(
+            Item={
+                "policy_number": cache_key,
+                "policy_data": json.dumps(policy_data),
+                "expires_at": int(time.time()) + POLICY_CACHE_TTL,
+            }
+        )
     except Exception as e:
-        print(f"Error connecting to Weaviate: {str(e)}")
-        raise
+        print(f"Error writing policy cache table: {str(e)}")
 
 
-def query_policy(policy_number: str) -> Dict[str, Any]:
-    """Query Weaviate for policy details."""
+def format_policy(properties: Dict[str, Any], match_type: str) -> Dict[str, Any]:
+    """Build the policy_data payload from PolicyDocuments properties."""
+    return {
+        "found": True,
+        "match_type": match_type,
+        "policy_id": properties.get("policy_id"),
+        "coverage_type": properties.get("coverage_type"),
+        "deductible": properties.get("deductible"),
+        "coverage_limit": properties.get("coverage_limit"),
+        "filing_deadline_days": properties.get("filing_deadline_days"),
+        "content": properties.get("content"),
+    }
+
+
+def find_policy_by_id(policies, policy_id: str) -> Optional[Dict[str, Any]]:
+    """Exact policy_id lookup using a property filter (no vector search)."""
+    from weaviate.classes.query import Filter
+
+    result = policies.query.fetch_objects(
+        filters=Filter.by_property("policy_id").equal(policy_id), limit=1
+    )
+
+    for obj in result.objects:
+        # Guard against partial matches on collections created with word tokenization
+        if normalize_policy_number(obj.properties.get("policy_id") or "") == policy_id:
+            return obj.properties
+
+    return None
+
+
+def query_weaviate_policy(policy_number: str) -> Dict[str, Any]:
+    """Query Weaviate PolicyDocuments for policy details."""
     try:
-        weaviate_client = get_weaviate_client()
+        weaviate_client = get_weaviate_client(secrets_manager)
         policies = weaviate_client.collections.get("PolicyDocuments")
 
+        # Fast path: policy numbers from intake are exact identifiers
+        start = time.perf_counter()
+        properties = find_policy_by_id(policies, normalize_policy_number(policy_number))
+        exact_ms = (time.perf_counter() - start) * 1000
+
+        if properties:
+            print(f"Exact policy match for {policy_number} in {exact_ms:.1f} ms")
+            return format_policy(properties, "exact")
+
         # Hybrid search (combines vector and keyword search)
+        start = time.perf_counter()
         result = policies.query.hybrid(query=policy_number, limit=1)
+        hybrid_ms = (time.perf_counter() - start) * 1000
 
-        weaviate_client.close()
+        print(
+            f"No exact policy match for {policy_number} ({exact_ms:.1f} ms), "
+            f"hybrid search took {hybrid_ms:.1f} ms"
+        )
 
         if result.objects:
-            policy_data = result.objects[0].properties
-            return {
-                "found": True,
-                "policy_id": policy_data.get("policy_id"),
-                "coverage_type": policy_data.get("coverage_type"),
-                "deductible": policy_data.get("deductible"),
-                "coverage_limit": policy_data.get("coverage_limit"),
-                "filing_deadline_days": policy_data.get("filing_deadline_days"),
-                "content": policy_data.get("content"),
-            }
+            return format_policy(result.objects[0].properties, "hybrid")
         else:
             return {"found": False, "error": "Policy not found"}
 
     except Exception as e:
         print(f"Error querying policy: {str(e)}")
+        reset_weaviate_client()
         return {"found": False, "error": str(e)}
 
 
+def query_policy(policy_number: str) -> Dict[str, Any]:
+    """Look up policy details, serving repeated policy numbers from the policy cache."""
+    cache_key = normalize_policy_number(policy_number)
+
+    policy_data = policy_cache.get(cache_key)
+    source = "memory"
+
+    if policy_data is None:
+        policy_data = get_shared_cached_policy(cache_key)
+        source = "dynamodb"
+
+        if policy_data is None:
+            policy_data = query_weaviate_policy(policy_number)
+            source = "weaviate"
+
+            # Only cache successful lookups so missing policies are picked up once loaded
+            if policy_data.get("found"):
+                put_shared_cached_policy(cache_key, policy_data)
+
+        if policy_data.get("found"):
+            policy_cache.set(cache_key, policy_data)
+
+    print(f"Policy {cache_key} served from {source}, cache: {json.dumps(policy_cache.stats())}")
+
+    # Callers (and the in-process express pipeline) may mutate the result; keep the
+    # cached entry untouched
+    return copy.deepcopy(policy_data)
+
+
 def lambda_handler(event, context):
     """Lambda handler for Policy Agent."""
+    audit = new_audit_writer()
+
     try:
         print(f"Event: {json.dumps(event)}")
 
         claim_id = event.get("claim_id")
-        entities = event.get("entities", {})
+        context = ClaimContext.from_event(event)
+        entities = context.get("entities", {})
 
         # Extract policy number from entities or use default for testing
         policy_number = entities.get("policy_number") or "AUTO-001"
@@ -88,8 +190,8 @@ def lambda_handler(event, context):
 
         # Log to DynamoDB AuditLog
         log_id = f"{claim_id}-policy"
-        audit_log_table.put_item(
-            Item={
+        audit.put(
+            {
                 "log_id": log_id,
                 "timestamp": datetime.now().isoformat(),
                 "claim_id": claim_id,
@@ -105,14 +207,18 @@ def lambda_handler(event, context):
             }
         )
 
+        context.put("policy_data", policy_data)
+
+        audit.flush()
+
         # Return result for Step Functions
         return {
             "statusCode": 200,
             "claim_id": claim_id,
+            "context_ref": context.reference(),
             "policy_number": policy_number,
-            "policy_data": policy_data,
-            "entities": entities,
-            "extracted_data": event.get("extracted_data"),
+            "policy_found": bool(policy_data.get("found")),
+            "policy_cache": policy_cache.stats(),
         }
 
     except Exception as e:
@@ -122,3 +228,6 @@ def lambda_handler(event, context):
         traceback.print_exc()
 
         return {"statusCode": 500, "error": str(e)}
+
+    finally:
+        audit.close()
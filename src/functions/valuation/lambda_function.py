@@ -9,13 +9,8 @@ import json
 from datetime import datetime
 from typing import Any, Dict
 
-import boto3
-
-# AWS clients
-dynamodb = boto3.resource("dynamodb")
-
-# DynamoDB table
-audit_log_table = dynamodb.Table("AuditLog")
+from shared.audit import new_audit_writer
+from shared.context import ClaimContext
 
 
 def get_vehicle_value(entities: Dict[str, Any]) -> Dict[str, Any]:
@@ -39,11 +34,14 @@ def get_vehicle_value(entities: Dict[str, Any]) -> Dict[str, Any]:
 
 def lambda_handler(event, context):
     """Lambda handler for Valuation Agent."""
+    audit = new_audit_writer()
+
     try:
         print(f"Event: {json.dumps(event)}")
 
         claim_id = event.get("claim_id")
-        entities = event.get("entities", {})
+        context = ClaimContext.from_event(event)
+        entities = context.get("entities", {})
 
         print(f"Getting vehicle valuation for claim {claim_id}")
 
@@ -52,8 +50,8 @@ def lambda_handler(event, context):
 
         # Log to DynamoDB AuditLog
         log_id = f"{claim_id}-valuation"
-        audit_log_table.put_item(
-            Item={
+        audit.put(
+            {
                 "log_id": log_id,
                 "timestamp": datetime.now().isoformat(),
                 "claim_id": claim_id,
@@ -64,15 +62,16 @@ def lambda_handler(event, context):
             }
         )
 
+        context.put("valuation", valuation)
+
+        audit.flush()
+
         # Return result for Step Functions
         return {
             "statusCode": 200,
             "claim_id": claim_id,
+            "context_ref": context.reference(),
             "valuation": valuation,
-            "damage_assessment": event.get("damage_assessment"),
-            "policy_data": event.get("policy_data"),
-            "entities": entities,
-            "extracted_data": event.get("extracted_data"),
         }
 
     except Exception as e:
@@ -82,3 +81,6 @@ def lambda_handler(event, context):
         traceback.print_exc()
 
         return {"statusCode": 500, "error": str(e)}
+
+    finally:
+        audit.close()
@@ -0,0 +1,197 @@
+"""
+Asynchronous, batched AuditLog writer used by all agents.
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import boto3
+
+from shared.config import Config
+
+# DynamoDB BatchWriteItem and SQS SendMessageBatch request limits
+DYNAMODB_BATCH_SIZE = 25
+SQS_BATCH_SIZE = 10
+
+# Attempts at writing items DynamoDB reports as unprocessed
+MAX_UNPROCESSED_RETRIES = 5
+
+# Queued by close() to stop the background thread
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Buffer AuditLog entries and write them in batches on a background thread.
+
+    Entries are written to DynamoDB with batch_write_item, or sent to an SQS
+    queue (drained into DynamoDB by sqs_handler) when queue_url is set. Each
+    invocation uses its own writer (see new_audit_writer): put() entries as soon
+    as they are known, flush() once before returning, since Lambda freezes
+    background threads between invocations, and close() when done.
+    """
+
+    def __init__(self, table_name: str = Config.AUDIT_LOG_TABLE, queue_url: str = ""):
+        self.table_name = table_name
+        self.queue_url = queue_url
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._failed: List[str] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._dynamodb = None
+        self._sqs = None
+
+    def put(self, item: Dict[str, Any]) -> None:
+        """Queue an AuditLog item for writing without blocking the caller."""
+        self._ensure_worker()
+        self._queue.put(item)
+
+    def flush(self) -> None:
+        """Block until every queued item is written; raise if any could not be."""
+        self._queue.join()
+
+        with self._lock:
+            failed, self._failed = self._failed, []
+
+        if failed:
+            raise Exception(f"Failed to write {len(failed)} audit log entries: {failed}")
+
+    def close(self) -> None:
+        """Stop the background thread once every queued item has been written."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+
+        if thread is None or not thread.is_alive():
+            return
+
+        self._queue.put(_STOP)
+        thread.join()
+
+        with self._lock:
+            failed, self._failed = self._failed, []
+
+        if failed:
+            print(f"Failed to write {len(failed)} audit log entries: {failed}")
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        batch_size = SQS_BATCH_SIZE if self.queue_url else DYNAMODB_BATCH_SIZE
+        stopping = False
+
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+
+            # Take whatever else is already queued, up to one request's worth
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    self._queue.task_done()
+                    break
+
+                batch.append(item)
+                if len(batch) == batch_size:
+                    break
+
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            if self.queue_url:
+                self._send_to_queue(batch)
+            else:
+                write_items(self._get_dynamodb(), self.table_name, batch)
+        except Exception as e:
+            print(f"Error writing audit log batch: {str(e)}")
+            with self._lock:
+                self._failed.extend(item.get("log_id", "?") for item in batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _send_to_queue(self, batch: List[Dict[str, Any]]) -> None:
+        if self._sqs is None:
+            self._sqs = boto3.client("sqs")
+
+        response = self._sqs.send_message_batch(
+            QueueUrl=self.queue_url,
+            Entries=[
+                {"Id": str(i), "MessageBody": json.dumps(item)} for i, item in enumerate(batch)
+            ],
+        )
+
+        if response.get("Failed"):
+            raise Exception(f"{len(response['Failed'])} audit messages rejected by SQS")
+
+    def _get_dynamodb(self):
+        if self._dynamodb is None:
+            self._dynamodb = boto3.resource("dynamodb")
+        return self._dynamodb
+
+
+def write_items(dynamodb, table_name: str, items: List[Dict[str, Any]]) -> None:
+    """
+    Write up to 25 items with batch_write_item, retrying unprocessed items.
+
+    Args:
+        dynamodb: Boto3 DynamoDB service resource
+        table_name: Target table name
+        items: Items to put
+    """
+    request_items = {table_name: [{"PutRequest": {"Item": item}} for item in items]}
+
+    for attempt in range(MAX_UNPROCESSED_RETRIES):
+        response = dynamodb.batch_write_item(RequestItems=request_items)
+        request_items = response.get("UnprocessedItems") or {}
+
+        if not request_items:
+            return
+
+        time.sleep(0.05 * 2**attempt)  # Back off while the table is throttling
+
+    raise Exception(f"{len(request_items.get(table_name, []))} items left unprocessed")
+
+
+def sqs_handler(event, context):
+    """Lambda handler draining queued audit entries into the AuditLog table."""
+    dynamodb = boto3.resource("dynamodb")
+    records = event.get("Records", [])
+    failures = []
+
+    for start in range(0, len(records), DYNAMODB_BATCH_SIZE):
+        batch = records[start : start + DYNAMODB_BATCH_SIZE]
+        try:
+            write_items(
+                dynamodb, Config.AUDIT_LOG_TABLE, [json.loads(record["body"]) for record in batch]
+            )
+        except Exception as e:
+            print(f"Error writing audit log batch: {str(e)}")
+            failures.extend({"itemIdentifier": record["messageId"]} for record in batch)
+
+    return {"batchItemFailures": failures}
+
+
+def new_audit_writer() -> AuditWriter:
+    """
+    Create the AuditLog writer for one handler invocation.
+
+    Returns:
+        AuditWriter sending to the audit queue when AUDIT_LOG_QUEUE_URL is set,
+        otherwise writing to the AuditLog table
+    """
+    return AuditWriter(queue_url=Config.AUDIT_LOG_QUEUE_URL)
@@ -0,0 +1,175 @@
+"""
+Long-lived service clients shared across warm Lambda invocations.
+"""
+
+import atexit
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import boto3
+
+from shared.config import Config
+from shared.utils import get_secret
+
+# Seconds between readiness probes of a cached Weaviate connection
+WEAVIATE_HEALTH_CHECK_INTERVAL = 30
+
+_weaviate_client = None
+_weaviate_checked_at = 0.0
+_weaviate_lock = threading.Lock()
+
+
+def _connect_weaviate(secrets_manager_client, force_refresh: bool = False):
+    """Open a new Weaviate Cloud connection with credentials from Secrets Manager."""
+    import weaviate
+    from weaviate.classes.init import Auth
+
+    secret_data = get_secret(
+        Config.WEAVIATE_SECRET_NAME, secrets_manager_client, force_refresh=force_refresh
+    )
+
+    return weaviate.connect_to_weaviate_cloud(
+        cluster_url=secret_data["url"],
+        auth_credentials=Auth.api_key(secret_data["api_key"]),
+    )
+
+
+def _is_healthy(client) -> bool:
+    """Check that a cached Weaviate client is still usable."""
+    global _weaviate_checked_at
+
+    try:
+        if not client.is_connected():
+            return False
+
+        if time.monotonic() - _weaviate_checked_at < WEAVIATE_HEALTH_CHECK_INTERVAL:
+            return True
+
+        ready = client.is_ready()
+        if ready:
+            _weaviate_checked_at = time.monotonic()
+        return ready
+
+    except Exception as e:
+        print(f"Weaviate health check failed: {str(e)}")
+        return False
+
+
+def get_weaviate_client(secrets_manager_client=None):
+    """
+    Return the container-wide Weaviate client, connecting lazily on first use.
+
+    The client is kept open across warm invocations and replaced when a health
+    check fails. Callers must not close it; use reset_weaviate_client() after an
+    error that suggests the connection is broken.
+
+    Args:
+        secrets_manager_client: Optional Boto3 Secrets Manager client
+
+    Returns:
+        Connected Weaviate client
+    """
+    global _weaviate_client, _weaviate_checked_at
+
+    with _weaviate_lock:
+        if _weaviate_client is not None and _is_healthy(_weaviate_client):
+            return _weaviate_client
+
+        _close_weaviate_client()
+
+        secrets_manager_client = secrets_manager_client or boto3.client("secretsmanager")
+
+        try:
+            _weaviate_client = _connect_weaviate(secrets_manager_client)
+        except Exception as e:
+            # Cached credentials may have been rotated; retry once with a fresh secret
+            print(f"Error connecting to Weaviate, refreshing credentials: {str(e)}")
+            try:
+                _weaviate_client = _connect_weaviate(secrets_manager_client, force_refresh=True)
+            except Exception as e:
+                print(f"Error connecting to Weaviate: {str(e)}")
+                raise
+
+        _weaviate_checked_at = time.monotonic()
+
+        return _weaviate_client
+
+
+def reset_weaviate_client() -> None:
+    """Drop the cached Weaviate client so the next call reconnects."""
+    with _weaviate_lock:
+        _close_weaviate_client()
+
+
+def _close_weaviate_client() -> None:
+    """Close the cached Weaviate client, ignoring errors from a dead connection."""
+    global _weaviate_client
+
+    client = _weaviate_client
+    _weaviate_client = None
+
+    if client is not None:
+        try:
+            client.close()
+        except Exception as e:
+            print(f"Error closing Weaviate client: {str(e)}")
+
+
+def batch_insert(
+    collection,
+    objects: Iterable[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    concurrent_requests: int = 2,
+    max_retries: int = 2,
+) -> Dict[str, int]:
+    """
+    Insert objects into a Weaviate collection in batches, retrying failed objects.
+
+    Without batch_size the client sizes batches dynamically from server load;
+    with batch_size, fixed-size batches are sent with concurrent_requests in flight.
+
+    Args:
+        collection: Weaviate collection handle
+        objects: Iterable of property dictionaries (consumed lazily on the first pass)
+        batch_size: Fixed batch size, or None for dynamic sizing
+        concurrent_requests: Parallel batch requests when using a fixed batch size
+        max_retries: Number of times failed objects are re-submitted
+
+    Returns:
+        Dictionary with inserted and failed object counts
+    """
+    pending = objects
+    inserted = 0
+    failed = []
+
+    for attempt in range(max_retries + 1):
+        if batch_size is None:
+            batcher = collection.batch.dynamic()
+        else:
+            batcher = collection.batch.fixed_size(
+                batch_size=batch_size, concurrent_requests=concurrent_requests
+            )
+
+        submitted = 0
+        with batcher as batch:
+            for properties in pending:
+                batch.add_object(properties=properties)
+                submitted += 1
+
+        failed = collection.batch.failed_objects
+        inserted += submitted - len(failed)
+
+        if not failed:
+            break
+
+        print(
+            f"Batch insert attempt {attempt + 1}: {len(failed)} of {submitted} objects failed "
+            f"({failed[0].message})"
+        )
+        pending = [error.object_.properties for error in failed]
+
+    return {"inserted": inserted, "failed": len(failed)}
+
+
+atexit.register(reset_weaviate_client)
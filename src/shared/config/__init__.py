@@ -14,8 +14,12 @@ class Config:
 
     # DynamoDB Tables
     CLAIMS_TABLE = os.environ.get("CLAIMS_TABLE", "Claims")
+    CLAIMS_LATEST_TABLE = os.environ.get("CLAIMS_LATEST_TABLE", "ClaimsLatest")
     AUDIT_LOG_TABLE = os.environ.get("AUDIT_LOG_TABLE", "AuditLog")
 
+    # SQS queue buffering AuditLog writes (written straight to DynamoDB when unset)
+    AUDIT_LOG_QUEUE_URL = os.environ.get("AUDIT_LOG_QUEUE_URL", "")
+
     # Step Functions
     STATE_MACHINE_ARN = os.environ.get("STATE_MACHINE_ARN", "")
 
@@ -0,0 +1,129 @@
+"""
+Claim-context store shared by the workflow agents.
+
+Agent outputs (extracted data, entities, policy, assessments) are written to S3,
+one object per section, and only a small context_ref is passed between Step
+Functions states. Agents load just the sections they need, on first access.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+import boto3
+
+from shared.cache import TTLCache
+from shared.config import Config
+from shared.ids import new_ulid
+
+# Key prefix for claim-context objects in the processed bucket
+CONTEXT_PREFIX = "claim-context"
+
+# Sections written in this process, so agents run in-process (shared.pipeline)
+# read each other's outputs without an S3 round trip
+_recent = TTLCache(maxsize=64, ttl=300)
+
+_s3 = None
+
+
+def _get_s3():
+    global _s3
+
+    if _s3 is None:
+        _s3 = boto3.client("s3")
+    return _s3
+
+
+class ClaimContext:
+    """
+    Lazily loaded view of a claim's stored workflow state.
+
+    Sections passed inline in the event take precedence over stored ones, so
+    agents still accept the full payload when invoked directly.
+    """
+
+    def __init__(self, claim_id: str, bucket: str, prefix: str, inline: Optional[Dict] = None):
+        self.claim_id = claim_id
+        self.bucket = bucket
+        self.prefix = prefix
+        self._sections: Dict[str, Any] = dict(inline or {})
+
+    @classmethod
+    def create(cls, claim_id: str, bucket: Optional[str] = None) -> "ClaimContext":
+        """Start a new context for one workflow run of a claim."""
+        bucket = bucket or f"{Config.BUCKET_PREFIX}-processed"
+        return cls(claim_id, bucket, f"{CONTEXT_PREFIX}/{claim_id}/{new_ulid()}/")
+
+    @classmethod
+    def from_event(cls, event: Dict[str, Any]) -> "ClaimContext":
+        """
+        Open the context referenced by an agent's input event.
+
+        Args:
+            event: Step Functions state with claim_id and context_ref
+
+        Returns:
+            ClaimContext backed by the referenced store, or by a new one if the
+            event carries no reference
+        """
+        claim_id = event.get("claim_id")
+        ref = event.get("context_ref")
+        inline = {
+            k: v for k, v in event.items() if k not in ("claim_id", "context_ref") and v is not None
+        }
+
+        if not ref:
+            context = cls.create(claim_id)
+            context._sections.update(inline)
+            return context
+
+        return cls(claim_id, ref["bucket"], ref["prefix"], inline)
+
+    def reference(self) -> Dict[str, str]:
+        """Return the small reference passed between workflow states."""
+        return {"bucket": self.bucket, "prefix": self.prefix}
+
+    def get(self, section: str, default: Any = None) -> Any:
+        """Return one section, loading it from S3 on first access."""
+        if section not in self._sections:
+            self._sections[section] = self._load(section)
+
+        value = self._sections[section]
+        return default if value is None else value
+
+    def get_many(self, sections: Iterable[str]) -> Dict[str, Any]:
+        """Return several sections, loading the missing ones concurrently."""
+        sections = list(sections)
+        missing = [section for section in sections if section not in self._sections]
+
+        if len(missing) > 1:
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                for section, value in zip(missing, executor.map(self._load, missing)):
+                    self._sections[section] = value
+
+        return {section: self.get(section) for section in sections}
+
+    def put(self, section: str, value: Any) -> None:
+        """Store one section for the downstream agents."""
+        key = f"{self.prefix}{section}.json"
+        _get_s3().put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=json.dumps(value, default=str),
+            ContentType="application/json",
+        )
+        self._sections[section] = value
+        _recent.set((self.bucket, key), value)
+
+    def _load(self, section: str) -> Any:
+        key = f"{self.prefix}{section}.json"
+        value = _recent.get((self.bucket, key))
+        if value is not None:
+            return value
+
+        try:
+            obj = _get_s3().get_object(Bucket=self.bucket, Key=key)
+        except _get_s3().exceptions.NoSuchKey:
+            return None
+
+        return json.loads(obj["Body"].read())
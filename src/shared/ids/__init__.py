@@ -0,0 +1,73 @@
+"""
+Collision-free, time-sortable identifiers for claims.
+"""
+
+import os
+import threading
+import time
+
+# Crockford base32 alphabet used by ULIDs (no I, L, O, U)
+ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# 48-bit millisecond timestamp followed by 80 random bits
+ULID_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def _reset_after_fork() -> None:
+    """Forked children must not continue the parent's monotonic sequence."""
+    global _last_ms, _last_random
+
+    _last_ms = 0
+    _last_random = 0
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def new_ulid() -> str:
+    """
+    Generate a ULID: 26 Crockford base32 characters that sort by creation time.
+
+    IDs generated in the same millisecond by this process increment the random
+    component, so they stay unique and ordered; other processes draw independent
+    80-bit random components.
+
+    Returns:
+        ULID string
+    """
+    global _last_ms, _last_random
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+
+        if now_ms <= _last_ms:
+            # Same millisecond (or the clock stepped back): continue the sequence
+            now_ms = _last_ms
+            random_part = _last_random + 1
+
+            if random_part >> ULID_RANDOM_BITS:
+                # Sequence exhausted for this millisecond; move to the next one
+                now_ms += 1
+                random_part = int.from_bytes(os.urandom(10), "big")
+        else:
+            random_part = int.from_bytes(os.urandom(10), "big")
+
+        _last_ms = now_ms
+        _last_random = random_part
+
+    value = (now_ms << ULID_RANDOM_BITS) | random_part
+    chars = []
+    for _ in range(26):
+        chars.append(ULID_ALPHABET[value & 0x1F])
+        value >>= 5
+
+    return "".join(reversed(chars))
+
+
+def new_claim_id() -> str:
+    """Generate a claim ID such as CLAIM-01JAB3X2Q4M7N8P9R0S1T2V3W4."""
+    return f"CLAIM-{new_ulid()}"
@@ -0,0 +1,108 @@
+"""
+Express pipeline: the claim workflow run in-process instead of through Step Functions.
+
+Each agent's lambda_handler is called as a plain function, following the same
+DAG as infrastructure/stepfunctions-workflow.json: intake, then policy, damage
+and valuation concurrently, then decision.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# Pipeline modes a claim can be routed to
+PIPELINE_STEPFUNCTIONS = "stepfunctions"
+PIPELINE_EXPRESS = "express"
+PIPELINES = (PIPELINE_STEPFUNCTIONS, PIPELINE_EXPRESS)
+
+# Agent modules live next to shared/ (src/functions locally, the zip root in Lambda)
+FUNCTIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "functions"
+)
+ASSESSMENT_AGENTS = ("policy", "damage", "valuation")
+
+_agents: Dict[str, Callable] = {}
+_agents_lock = threading.Lock()
+
+
+def get_agent_handler(name: str) -> Callable:
+    """
+    Load an agent's lambda_handler once per process.
+
+    Args:
+        name: Agent name (directory under functions/)
+
+    Returns:
+        The agent module's lambda_handler
+    """
+    with _agents_lock:
+        if name not in _agents:
+            path = os.path.join(FUNCTIONS_DIR, name, "lambda_function.py")
+            spec = importlib.util.spec_from_file_location(f"claimvoyant_{name}_agent", path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[spec.name] = module
+            spec.loader.exec_module(module)
+            _agents[name] = module.lambda_handler
+
+        return _agents[name]
+
+
+def run_agent(name: str, event: Dict[str, Any], timings: Dict[str, float]) -> Dict[str, Any]:
+    """Invoke one agent in-process, recording its latency and raising on failure."""
+    handler = get_agent_handler(name)
+
+    start = time.perf_counter()
+    result = handler(event, None)
+    timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    if result.get("statusCode") != 200:
+        raise Exception(f"{name} agent failed: {result.get('error', result.get('statusCode'))}")
+
+    return result
+
+
+def run_pipeline(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run intake, assessment and decision for one claim object in-process.
+
+    Args:
+        event: Workflow input with claim_id, bucket and key
+
+    Returns:
+        Decision agent result with pipeline and per-agent timings_ms added
+    """
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+
+    # No task token: with Textract in poll mode (the default), intake returns 200 directly
+    intake = run_agent("intake", event, timings)
+    state = {"claim_id": intake["claim_id"], "context_ref": intake["context_ref"]}
+
+    with ThreadPoolExecutor(max_workers=len(ASSESSMENT_AGENTS)) as executor:
+        futures = {
+            name: executor.submit(run_agent, name, state, timings) for name in ASSESSMENT_AGENTS
+        }
+        results = {name: future.result() for name, future in futures.items()}
+
+    decision = run_agent(
+        "decision",
+        {
+            **state,
+            "policy_number": results["policy"]["policy_number"],
+            "policy_found": results["policy"]["policy_found"],
+            "damage_assessment": results["damage"]["damage_assessment"],
+            "valuation": results["valuation"]["valuation"],
+        },
+        timings,
+    )
+
+    timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+    print(
+        f"Express pipeline for claim {state['claim_id']} completed in {timings['total']} ms: {timings}"
+    )
+
+    return {**decision, "pipeline": PIPELINE_EXPRESS, "timings_ms": timings}
@@ -3,7 +3,24 @@ Utility functions for Claimvoyant Lambda functions.
 """
 
 import json
-from typing import Any, Dict
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, Tuple
+
+# Seconds a cached secret is served before it must be fetched again
+SECRET_CACHE_TTL = 300
+
+# Fraction of the TTL after which a background refresh is started
+SECRET_REFRESH_AHEAD = 0.8
+
+# ClaimsLatest items are spread over one LatestByTimestamp partition per day
+CLAIMS_LIST_PK_PREFIX = "CLAIMS#"
+
+# secret_name -> (fetched_at, secret_data)
+_secret_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_secret_refreshing = set()
+_secret_lock = threading.Lock()
 
 
 def create_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
@@ -29,16 +46,106 @@ def create_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def get_secret(secret_name: str, secrets_manager_client) -> Dict[str, Any]:
+def to_dynamodb_value(value: Any) -> Any:
     """
-    Retrieve a secret from AWS Secrets Manager.
+    Convert JSON-compatible data to types accepted by the boto3 DynamoDB resource.
+
+    Args:
+        value: JSON-compatible value (floats become Decimal)
+
+    Returns:
+        Value suitable for a DynamoDB item attribute
+    """
+    return json.loads(json.dumps(value), parse_float=Decimal)
+
+
+def decimal_default(value: Any) -> Any:
+    """json.dumps default hook rendering DynamoDB Decimals as int or float."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def claims_list_pk(timestamp: str) -> str:
+    """
+    Return the LatestByTimestamp partition key for a claim timestamp.
+
+    Args:
+        timestamp: ISO 8601 date or timestamp
+
+    Returns:
+        Day-sharded list_pk, e.g. CLAIMS#2025-10-22
+    """
+    return f"{CLAIMS_LIST_PK_PREFIX}{timestamp[:10]}"
+
+
+def _fetch_secret(secret_name: str, secrets_manager_client) -> Dict[str, Any]:
+    """Fetch a secret from Secrets Manager and store it in the cache."""
+    secret_response = secrets_manager_client.get_secret_value(SecretId=secret_name)
+    secret_data = json.loads(secret_response["SecretString"])
+
+    with _secret_lock:
+        _secret_cache[secret_name] = (time.monotonic(), secret_data)
+
+    return secret_data
+
+
+def _refresh_secret(secret_name: str, secrets_manager_client) -> None:
+    """Refresh a cached secret in the background, keeping the old value on failure."""
+    try:
+        _fetch_secret(secret_name, secrets_manager_client)
+    except Exception as e:
+        print(f"Error refreshing secret {secret_name}: {str(e)}")
+    finally:
+        with _secret_lock:
+            _secret_refreshing.discard(secret_name)
+
+
+def get_secret(
+    secret_name: str,
+    secrets_manager_client,
+    ttl: float = SECRET_CACHE_TTL,
+    force_refresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Retrieve a secret from AWS Secrets Manager, cached in-process for warm invocations.
+
+    Once a cached value is older than SECRET_REFRESH_AHEAD of its TTL it is still
+    returned, but a background refresh is started so callers rarely wait on
+    Secrets Manager.
 
     Args:
         secret_name: Name of the secret
         secrets_manager_client: Boto3 Secrets Manager client
+        ttl: Seconds a cached value may be served
+        force_refresh: Bypass the cache, e.g. after an authentication failure
 
     Returns:
         Dictionary containing secret data
     """
-    secret_response = secrets_manager_client.get_secret_value(SecretId=secret_name)
-    return json.loads(secret_response["SecretString"])
+    if not force_refresh:
+        with _secret_lock:
+            cached = _secret_cache.get(secret_name)
+
+            if cached is not None:
+                fetched_at, secret_data = cached
+                age = time.monotonic() - fetched_at
+
+                if age < ttl:
+                    if age >= ttl * SECRET_REFRESH_AHEAD and secret_name not in _secret_refreshing:
+                        _secret_refreshing.add(secret_name)
+                        threading.Thread(
+                            target=_refresh_secret,
+                            args=(secret_name, secrets_manager_client),
+                            daemon=True,
+                        ).start()
+
+                    return secret_data
+
+    return _fetch_secret(secret_name, secrets_manager_client)
+
+
+def invalidate_secret(secret_name: str) -> None:
+    """Remove a secret from the in-process cache."""
+    with _secret_lock:
+        _secret_cache.pop(secret_name, None)
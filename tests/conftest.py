@@ -0,0 +1,86 @@
+"""
+Shared test setup.
+
+Agent modules create their boto3 clients at import time, so fake credentials
+and a region are set before anything is loaded. Lambda functions are imported
+by path, the same way shared.pipeline loads them.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT, "src")
+FUNCTIONS_DIR = os.path.join(SRC_DIR, "functions")
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_SESSION_TOKEN", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("BUCKET_PREFIX", "claimvoyant-test")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-slow", action="store_true", help="run tests marked slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip load tests unless --run-slow is given."""
+    if config.getoption("--run-slow"):
+        return
+
+    skip_slow = pytest.mark.skip(reason="load test, run with --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+def load_function(name: str, filename: str = "lambda_function.py"):
+    """Import a Lambda function module from src/functions/<name>/."""
+    module_name = f"test_{name}_{os.path.splitext(filename)[0]}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(
+        module_name, os.path.join(FUNCTIONS_DIR, name, filename)
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def intake():
+    """The intake agent module."""
+    return load_function("intake")
+
+
+@pytest.fixture
+def policy():
+    """The policy agent module."""
+    return load_function("policy")
+
+
+@pytest.fixture
+def decision():
+    """The decision agent module."""
+    return load_function("decision")
+
+
+@pytest.fixture
+def api():
+    """The API module deployed as claimvoyant-api."""
+    return load_function("api", "lambda_function_simple.py")
+
+
+@pytest.fixture
+def express():
+    """The express pipeline function module."""
+    return load_function("express")
@@ -0,0 +1,437 @@
+"""Tests for the REST API."""
+
+import base64
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from shared.utils import claims_list_pk
+
+
+def days_ago(days, hour=12):
+    day = datetime.now(timezone.utc).date() - timedelta(days=days)
+    return f"{day.isoformat()}T{hour:02d}:00:00"
+
+
+@pytest.fixture
+def claims_latest(api, decision, monkeypatch):
+    """Moto-backed ClaimsLatest table with the GSIs created by setup_aws_infrastructure.sh."""
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName="ClaimsLatest",
+            AttributeDefinitions=[
+                {"AttributeName": name, "AttributeType": "S"}
+                for name in ("claim_id", "list_pk", "timestamp", "status")
+            ],
+            KeySchema=[{"AttributeName": "claim_id", "KeyType": "HASH"}],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "LatestByTimestamp",
+                    "KeySchema": [
+                        {"AttributeName": "list_pk", "KeyType": "HASH"},
+                        {"AttributeName": "timestamp", "KeyType": "RANGE"},
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                },
+                {
+                    "IndexName": "LatestByStatus",
+                    "KeySchema": [
+                        {"AttributeName": "status", "KeyType": "HASH"},
+                        {"AttributeName": "timestamp", "KeyType": "RANGE"},
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                },
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        monkeypatch.setattr(api, "claims_latest_table", table)
+        monkeypatch.setattr(decision, "claims_latest_table", table)
+        yield table
+
+
+def put_claim(decision, claim_id, timestamp, status="APPROVED"):
+    decision.put_latest_claim(
+        {"claim_id": claim_id, "version": timestamp, "status": status, "timestamp": timestamp},
+        {"decision": status, "confidence": 0.9},
+        {},
+    )
+
+
+def list_claims(api, **params):
+    result = api.handle_list_claims(**params)
+    return result["statusCode"], json.loads(result["body"])
+
+
+def list_all(api, **params):
+    claim_ids, cursor = [], None
+    while True:
+        status, body = list_claims(api, cursor=cursor, **params)
+        assert status == 200
+        claim_ids += [claim["claim_id"] for claim in body["claims"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return claim_ids
+
+
+def test_latest_claims_are_sharded_by_day(decision, claims_latest):
+    put_claim(decision, "CLAIM-A", "2025-10-22T08:00:00")
+
+    item = claims_latest.get_item(Key={"claim_id": "CLAIM-A"})["Item"]
+    assert item["list_pk"] == claims_list_pk("2025-10-22T08:00:00") == "CLAIMS#2025-10-22"
+
+
+def test_list_pages_across_day_shards_newest_first(api, decision, claims_latest):
+    # Five claims today, none yesterday, three two days ago, one last week
+    timestamps = {f"TODAY-{h}": days_ago(0, h) for h in range(5)}
+    timestamps.update({f"OLDER-{h}": days_ago(2, h) for h in range(3)})
+    timestamps["LAST-WEEK"] = days_ago(7)
+    for claim_id, timestamp in timestamps.items():
+        put_claim(decision, claim_id, timestamp)
+
+    status, body = list_claims(api, limit=4)
+    assert status == 200
+    assert [claim["claim_id"] for claim in body["claims"]] == [
+        "TODAY-4",
+        "TODAY-3",
+        "TODAY-2",
+        "TODAY-1",
+    ]
+    assert body["next_cursor"]
+
+    expected = sorted(timestamps, key=timestamps.get, reverse=True)
+    assert list_all(api, limit=3) == expected
+    assert list_all(api, limit=100) == expected
+
+
+def test_list_filters_by_since_and_until(api, decision, claims_latest):
+    for days in range(6):
+        put_claim(decision, f"CLAIM-{days}", days_ago(days))
+
+    since = days_ago(4)[:10]
+    until = days_ago(1)[:10]
+    assert list_all(api, since=since, until=until, limit=2) == [
+        "CLAIM-1",
+        "CLAIM-2",
+        "CLAIM-3",
+        "CLAIM-4",
+    ]
+    assert list_all(api, since=days_ago(2), limit=10) == ["CLAIM-0", "CLAIM-1", "CLAIM-2"]
+
+
+def test_list_by_status_pages_through_status_index(api, decision, claims_latest):
+    for hour in range(5):
+        put_claim(decision, f"DENIED-{hour}", days_ago(hour, hour), status="DENIED")
+    put_claim(decision, "APPROVED-0", days_ago(0))
+
+    assert list_all(api, status="denied", limit=2) == [f"DENIED-{h}" for h in range(5)]
+
+
+def test_list_rejects_since_after_until(api, claims_latest):
+    status, body = list_claims(api, since="2025-10-22", until="2025-10-21")
+
+    assert status == 400
+    assert "since" in body["error"]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"limit": "0"}, {"limit": "abc"}, {"since": "yesterday"}, {"cursor": "not-a-cursor"}],
+)
+def test_list_rejects_invalid_parameters(api, claims_latest, params):
+    assert list_claims(api, **params)[0] == 400
+
+
+def encode_state(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def test_list_rejects_cursors_from_another_listing(api, decision, claims_latest):
+    for hour in range(3):
+        put_claim(decision, f"DENIED-{hour}", days_ago(0, hour), status="DENIED")
+
+    status_cursor = list_claims(api, status="DENIED", limit=1)[1]["next_cursor"]
+    day_cursor = list_claims(api, limit=1)[1]["next_cursor"]
+    assert list_claims(api, status="DENIED", cursor=status_cursor)[0] == 200
+    assert list_claims(api, cursor=day_cursor)[0] == 200
+
+    assert list_claims(api, cursor=status_cursor)[0] == 400
+    assert list_claims(api, status="DENIED", cursor=day_cursor)[0] == 400
+    assert list_claims(api, status="APPROVED", cursor=status_cursor)[0] == 400
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        {"key": None},
+        {"day": "2025-10-22"},
+        {"day": "yesterday", "key": None},
+        {"day": "2025-10-22", "key": "CLAIM-1"},
+        {"day": "2025-10-22", "key": {"claim_id": "CLAIM-1"}},
+        {
+            "day": "2025-10-22",
+            "key": {"claim_id": "CLAIM-1", "list_pk": "CLAIMS#2025-10-21", "timestamp": "x"},
+        },
+        {"key": {"claim_id": "CLAIM-1", "status": "DENIED", "timestamp": 1}},
+    ],
+)
+def test_list_rejects_malformed_cursors(api, claims_latest, state):
+    assert list_claims(api, cursor=encode_state(state))[0] == 400
+    assert list_claims(api, status="DENIED", cursor=encode_state(state))[0] == 400
+
+
+def test_bare_until_date_includes_the_whole_day(api, decision, claims_latest):
+    day = days_ago(1)[:10]
+    put_claim(decision, "LAST-MOMENT", f"{day}T23:59:59.999999")
+    put_claim(decision, "NEXT-DAY", f"{days_ago(0)[:10]}T00:00:00")
+
+    assert list_all(api, until=day) == ["LAST-MOMENT"]
+    assert list_all(api, until=day, since=days_ago(3)[:10]) == ["LAST-MOMENT"]
+    assert list_all(api, until=day, status="APPROVED") == ["LAST-MOMENT"]
+    assert list_claims(api, since=days_ago(0)[:10], until=day)[0] == 400
+
+
+def test_include_extracted_data_returns_the_full_extraction(
+    api, decision, claims_latest, monkeypatch
+):
+    s3 = boto3.client("s3", region_name="us-east-1")
+    s3.create_bucket(Bucket="reports")
+    claims_table = boto3.resource("dynamodb", region_name="us-east-1").create_table(
+        TableName="Claims",
+        AttributeDefinitions=[
+            {"AttributeName": "claim_id", "AttributeType": "S"},
+            {"AttributeName": "version", "AttributeType": "S"},
+        ],
+        KeySchema=[
+            {"AttributeName": "claim_id", "KeyType": "HASH"},
+            {"AttributeName": "version", "KeyType": "RANGE"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    monkeypatch.setattr(api, "s3", s3)
+    monkeypatch.setattr(api, "claims_table", claims_table)
+
+    full = {"file_type": "pdf", "text": "z" * 50000}
+    s3.put_object(Bucket="reports", Key="CLAIM-1/extracted_data/v1.json", Body=json.dumps(full))
+    ref = {"bucket": "reports", "key": "CLAIM-1/extracted_data/v1.json"}
+    for claim_id, extra in (("CLAIM-1", {"extracted_data_ref": json.dumps(ref)}), ("CLAIM-0", {})):
+        timestamp = days_ago(0)
+        put_claim(decision, claim_id, timestamp)
+        claims_table.put_item(
+            Item={
+                "claim_id": claim_id,
+                "version": timestamp,
+                "extracted_data": json.dumps({"file_type": "pdf", "text": "summary"}),
+                **extra,
+            }
+        )
+
+    def extracted(claim_id):
+        result = api.handle_get_claim(claim_id, ["extracted_data"])
+        return json.loads(result["body"])["extracted_data"]
+
+    assert extracted("CLAIM-1") == full
+    assert extracted("CLAIM-0") == {"file_type": "pdf", "text": "summary"}
+
+
+@pytest.mark.slow
+def test_list_page_latency_stays_flat_over_a_million_claims(api, claims_latest):
+    """Cursor pages cost the same deep in the listing as at its start (LOAD_TEST_ROWS rows)."""
+    rows = int(os.environ.get("LOAD_TEST_ROWS", "1000000"))
+    days = 90
+    with claims_latest.batch_writer() as batch:
+        for i in range(rows):
+            seconds = (i // days) % 86400
+            timestamp = (
+                f"{days_ago(i % days)[:10]}T{seconds // 3600:02d}:{seconds // 60 % 60:02d}:"
+                f"{seconds % 60:02d}.{i:07d}"
+            )
+            batch.put_item(
+                Item={
+                    "claim_id": f"CLAIM-{i:07d}",
+                    "list_pk": claims_list_pk(timestamp),
+                    "version": timestamp,
+                    "status": "APPROVED",
+                    "timestamp": timestamp,
+                    "decision": "APPROVED",
+                }
+            )
+
+    pages = min(50, rows // 100)
+    cursor, seen, latencies = None, [], []
+    for _ in range(pages):
+        start = time.perf_counter()
+        status, body = list_claims(api, limit=100, cursor=cursor)
+        latencies.append(time.perf_counter() - start)
+
+        assert status == 200
+        assert len(body["claims"]) == 100
+        seen += [claim["timestamp"] for claim in body["claims"]]
+        cursor = body["next_cursor"]
+
+    assert seen == sorted(set(seen), reverse=True)
+    window = max(1, pages // 5)
+    assert statistics.median(latencies[-window:]) < 3 * statistics.median(latencies[:window])
+
+
+@pytest.fixture
+def raw_claims(api, monkeypatch):
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=f"{api.BUCKET_PREFIX}-raw-claims")
+        monkeypatch.setattr(api, "s3", s3)
+        yield s3
+
+
+def upload_claim(api, files, **extra):
+    result = api.handle_upload_claim({"body": json.dumps({"files": files, **extra})})
+    return result["statusCode"], json.loads(result["body"])
+
+
+def test_single_upload_policy_limits_size_type_and_metadata(api, raw_claims):
+    status, body = upload_claim(
+        api,
+        [{"filename": "estimate.pdf", "content_type": "application/pdf", "size": 2048}],
+        pipeline="express",
+    )
+
+    assert status == 200
+    upload = body["uploads"][0]
+    assert upload["method"] == "POST"
+    assert upload["fields"]["key"] == upload["key"]
+    assert upload["fields"]["x-amz-meta-pipeline"] == "express"
+    assert upload["fields"]["x-amz-meta-claim-files"] == "1"
+    assert upload["fields"]["x-amz-meta-declared-size"] == "2048"
+
+    policy = json.loads(base64.b64decode(upload["fields"]["policy"]))
+    conditions = policy["conditions"]
+    assert ["content-length-range", 1, 2048] in conditions
+    assert {"Content-Type": "application/pdf"} in conditions
+    assert {"x-amz-meta-pipeline": "express"} in conditions
+    assert {"x-amz-meta-claim-files": "1"} in conditions
+
+
+def test_large_upload_is_multipart(api, raw_claims):
+    size = api.UPLOAD_MULTIPART_THRESHOLD + api.UPLOAD_PART_SIZE + 1
+    status, body = upload_claim(api, [{"filename": "video.jpg", "size": size}])
+
+    assert status == 200
+    upload = body["uploads"][0]
+    assert upload["method"] == "MULTIPART"
+    assert len(upload["parts"]) == -(-size // api.UPLOAD_PART_SIZE)
+
+
+@pytest.mark.parametrize("size", [None, 0, -1, 6 * 1024**3])
+def test_upload_requires_a_valid_size(api, raw_claims, size):
+    status, body = upload_claim(api, [{"filename": "estimate.pdf", "size": size}])
+
+    assert status == 400
+    assert "Invalid size" in body["error"]
+
+
+@pytest.fixture
+def pipeline_starts(api, raw_claims, monkeypatch):
+    """PipelineStarts table and a recording Lambda client, inside the raw_claims mock."""
+    table = boto3.resource("dynamodb", region_name="us-east-1").create_table(
+        TableName="PipelineStarts",
+        AttributeDefinitions=[{"AttributeName": "execution_name", "AttributeType": "S"}],
+        KeySchema=[{"AttributeName": "execution_name", "KeyType": "HASH"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    invokes = []
+
+    class LambdaClient:
+        def invoke(self, **params):
+            invokes.append(json.loads(params["Payload"]))
+
+    monkeypatch.setattr(api, "pipeline_starts_table", table)
+    monkeypatch.setattr(api, "lambda_client", LambdaClient())
+    yield invokes
+
+
+def put_upload(api, raw_claims, key, claim_files=1, declared_size=4):
+    bucket = f"{api.BUCKET_PREFIX}-raw-claims"
+    raw_claims.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=b"%PDF",
+        Metadata={
+            "pipeline": "express",
+            "claim-files": str(claim_files),
+            "declared-size": str(declared_size),
+        },
+    )
+    return {"Records": [{"s3": {"bucket": {"name": bucket}, "object": {"key": key}}}]}
+
+
+def test_redelivered_upload_starts_express_pipeline_once(api, raw_claims, pipeline_starts):
+    event = put_upload(api, raw_claims, "CLAIM-1/estimate.pdf")
+
+    first = api.object_created_handler(event, None)
+    second = api.object_created_handler(event, None)
+
+    assert len(first["executions"]) == 1
+    assert second["executions"] == []
+    assert [payload["key"] for payload in pipeline_starts] == ["CLAIM-1/estimate.pdf"]
+
+
+def test_failed_express_invoke_can_be_retried(api, raw_claims, pipeline_starts, monkeypatch):
+    event = put_upload(api, raw_claims, "CLAIM-1/estimate.pdf")
+
+    class FailingLambdaClient:
+        def invoke(self, **params):
+            raise RuntimeError("throttled")
+
+    with monkeypatch.context() as m:
+        m.setattr(api, "lambda_client", FailingLambdaClient())
+        with pytest.raises(RuntimeError):
+            api.object_created_handler(event, None)
+
+    assert len(api.object_created_handler(event, None)["executions"]) == 1
+
+
+def test_multi_file_claim_starts_express_pipeline_once(api, raw_claims, pipeline_starts):
+    put_upload(api, raw_claims, "CLAIM-2/estimate.pdf", claim_files=2)
+    event = put_upload(api, raw_claims, "CLAIM-2/photo.jpg", claim_files=2)
+
+    assert api.object_created_handler(event, None)["executions"] == ["claimvoyant-express:CLAIM-2"]
+    assert api.object_created_handler(event, None)["executions"] == []
+    assert pipeline_starts == [
+        {"claim_id": "CLAIM-2", "bucket": f"{api.BUCKET_PREFIX}-raw-claims", "prefix": "CLAIM-2/"}
+    ]
+
+
+def test_object_larger_than_declared_size_is_rejected(api, raw_claims, pipeline_starts):
+    event = put_upload(api, raw_claims, "CLAIM-3/estimate.pdf", declared_size=3)
+
+    assert api.object_created_handler(event, None)["executions"] == []
+    assert pipeline_starts == []
+    assert raw_claims.list_objects_v2(Bucket=f"{api.BUCKET_PREFIX}-raw-claims")["KeyCount"] == 0
+
+
+def test_files_sharing_a_basename_get_distinct_keys(api, raw_claims, pipeline_starts):
+    files = [{"filename": name, "size": 4} for name in ("a.jpg", "dir/a.jpg", "A.jpg")]
+    status, body = upload_claim(api, files, pipeline="express")
+
+    assert status == 200
+    keys = [upload["key"] for upload in body["uploads"]]
+    claim_id = body["claim_id"]
+    assert keys == [f"{claim_id}/a.jpg", f"{claim_id}/a-2.jpg", f"{claim_id}/A.jpg"]
+    assert {upload["fields"]["x-amz-meta-claim-files"] for upload in body["uploads"]} == {"3"}
+
+    # The claim starts once every distinct object has arrived
+    executions = [
+        api.object_created_handler(put_upload(api, raw_claims, key, claim_files=3), None)
+        for key in keys
+    ]
+    assert [result["executions"] for result in executions] == [
+        [],
+        [],
+        [f"claimvoyant-express:{claim_id}"],
+    ]
@@ -0,0 +1,132 @@
+"""Tests for shared.audit."""
+
+import json
+import threading
+
+import pytest
+
+from shared import audit
+
+
+class FakeDynamoDB:
+    def __init__(self, fail=False):
+        self.requests = []
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def batch_write_item(self, RequestItems):
+        if self.fail:
+            raise Exception("throttled")
+        with self.lock:
+            self.requests.append(RequestItems)
+        return {"UnprocessedItems": {}}
+
+    def items(self, table_name="AuditLog"):
+        return [
+            request["PutRequest"]["Item"]["log_id"]
+            for batch in self.requests
+            for request in batch[table_name]
+        ]
+
+
+class FakeSQS:
+    def __init__(self):
+        self.batches = []
+
+    def send_message_batch(self, QueueUrl, Entries):
+        self.batches.append((QueueUrl, Entries))
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries]}
+
+
+def make_writer(dynamodb, **kwargs):
+    writer = audit.AuditWriter(table_name="AuditLog", **kwargs)
+    writer._dynamodb = dynamodb
+    return writer
+
+
+def test_flush_writes_every_item_in_batches():
+    dynamodb = FakeDynamoDB()
+    writer = make_writer(dynamodb)
+
+    for i in range(60):
+        writer.put({"log_id": f"log-{i}"})
+    writer.flush()
+
+    assert sorted(dynamodb.items()) == sorted(f"log-{i}" for i in range(60))
+    assert all(len(batch["AuditLog"]) <= audit.DYNAMODB_BATCH_SIZE for batch in dynamodb.requests)
+    writer.close()
+
+
+def test_close_stops_the_worker_thread():
+    writer = make_writer(FakeDynamoDB())
+    writer.put({"log_id": "a"})
+    thread = writer._thread
+
+    writer.close()
+
+    assert not thread.is_alive()
+    # Closing again, or a writer that never started, is a no-op
+    writer.close()
+    make_writer(FakeDynamoDB()).close()
+
+
+def test_close_writes_items_that_were_not_flushed():
+    dynamodb = FakeDynamoDB()
+    writer = make_writer(dynamodb)
+
+    writer.put({"log_id": "a"})
+    writer.put({"log_id": "b"})
+    writer.close()
+
+    assert sorted(dynamodb.items()) == ["a", "b"]
+
+
+def test_writers_flush_independently():
+    first_db, second_db = FakeDynamoDB(), FakeDynamoDB()
+    first, second = make_writer(first_db), make_writer(second_db)
+
+    first.put({"log_id": "first"})
+    second.put({"log_id": "second"})
+    first.flush()
+    second.flush()
+
+    assert first_db.items() == ["first"]
+    assert second_db.items() == ["second"]
+    first.close()
+    second.close()
+
+
+def test_flush_raises_for_failed_items():
+    writer = make_writer(FakeDynamoDB(fail=True))
+    writer.put({"log_id": "lost"})
+
+    with pytest.raises(Exception, match="lost"):
+        writer.flush()
+    writer.close()
+
+
+def test_queue_mode_sends_sqs_batches():
+    sqs = FakeSQS()
+    writer = audit.AuditWriter(queue_url="https://sqs.example/audit")
+    writer._sqs = sqs
+
+    for i in range(15):
+        writer.put({"log_id": f"log-{i}"})
+    writer.flush()
+    writer.close()
+
+    bodies = [json.loads(entry["MessageBody"]) for _, entries in sqs.batches for entry in entries]
+    assert sorted(body["log_id"] for body in bodies) == sorted(f"log-{i}" for i in range(15))
+    assert all(len(entries) <= audit.SQS_BATCH_SIZE for _, entries in sqs.batches)
+
+
+def test_sqs_handler_reports_failed_batches(monkeypatch):
+    dynamodb = FakeDynamoDB(fail=True)
+    monkeypatch.setattr(audit.boto3, "resource", lambda service: dynamodb)
+
+    records = [
+        {"messageId": f"m-{i}", "body": json.dumps({"log_id": f"log-{i}"})} for i in range(3)
+    ]
+    result = audit.sqs_handler({"Records": records}, None)
+
+    assert result == {"batchItemFailures": [{"itemIdentifier": f"m-{i}"} for i in range(3)]}
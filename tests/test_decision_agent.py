@@ -0,0 +1,226 @@
+"""Tests for the decision agent."""
+
+import json
+
+DECISION = {
+    "decision": "APPROVE",
+    "reasoning": "Covered collision",
+    "confidence": 0.9,
+    "estimated_payout": 1200,
+    "deductible_applies": True,
+    "required_actions": [],
+    "risk_factors": [],
+}
+
+
+def chunk_event(payload):
+    return {"chunk": {"bytes": json.dumps(payload).encode()}}
+
+
+def text_delta(text):
+    return chunk_event(
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": text}}
+    )
+
+
+class FakeStream:
+    """Bedrock event stream that records how far it was read and whether it was closed."""
+
+    def __init__(self, events):
+        self.events = events
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for event in self.events:
+            self.consumed += 1
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBedrock:
+    def __init__(self, stream):
+        self.stream = stream
+        self.requests = []
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        self.requests.append(kwargs)
+        return {"body": self.stream}
+
+
+def split(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_streaming_stops_once_decision_json_is_complete(decision, monkeypatch):
+    body = "Here is the decision: " + json.dumps(DECISION)
+    events = (
+        [chunk_event({"type": "message_start"})]
+        + [text_delta(part) for part in split(body, 7)]
+        + [text_delta(" trailing commentary")] * 50
+        + [chunk_event({"type": "message_stop"})]
+    )
+    stream = FakeStream(events)
+    bedrock = FakeBedrock(stream)
+    monkeypatch.setattr(decision, "bedrock", bedrock)
+    monkeypatch.setattr(decision, "BEDROCK_STREAMING", True)
+
+    result = decision.invoke_claude("prompt")
+
+    assert result == DECISION
+    assert stream.closed
+    assert stream.consumed < len(events) - 50
+    assert bedrock.requests[0]["modelId"] == decision.MODEL_ID
+    assert json.loads(bedrock.requests[0]["body"])["messages"][0]["content"] == "prompt"
+
+
+def test_streaming_accepts_partial_decision_when_stream_ends(decision, monkeypatch):
+    partial = {"decision": "REVIEW", "reasoning": "Missing photos", "confidence": 0.4}
+    stream = FakeStream([text_delta(part) for part in split(json.dumps(partial), 5)])
+    monkeypatch.setattr(decision, "bedrock", FakeBedrock(stream))
+    monkeypatch.setattr(decision, "BEDROCK_STREAMING", True)
+
+    assert decision.invoke_claude("prompt") == partial
+    assert stream.closed
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def put_item(self, **kwargs):
+        self.calls.append(kwargs)
+
+    def put_object(self, **kwargs):
+        self.calls.append(kwargs)
+
+
+class NullAuditWriter:
+    def put(self, item):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_extracted_data_summary_trims_text_only(decision):
+    extracted = {
+        "file_type": "pdf",
+        "text": "x" * 50000,
+        "detected_text": "short",
+        "labels": [{"name": "Car", "confidence": 99.0}],
+    }
+
+    summary = decision.summarize_extracted_data(extracted)
+
+    assert len(summary["text"]) < 5000
+    assert summary["detected_text"] == "short"
+    assert summary["labels"] == extracted["labels"]
+    assert len(extracted["text"]) == 50000
+
+
+def test_claims_item_keeps_summary_and_full_extraction_reference(decision, monkeypatch):
+    claims_table, s3 = Recorder(), Recorder()
+    monkeypatch.setattr(decision, "claims_table", claims_table)
+    monkeypatch.setattr(decision, "s3", s3)
+    monkeypatch.setattr(decision, "put_latest_claim", lambda *args: None)
+    monkeypatch.setattr(decision, "get_cached_decision", lambda key: dict(DECISION))
+    monkeypatch.setattr(decision, "new_audit_writer", NullAuditWriter)
+
+    result = decision.lambda_handler(
+        {
+            "claim_id": "CLAIM-1",
+            "policy_data": {"found": True, "policy_id": "AUTO-001"},
+            "extracted_data": {"file_type": "pdf", "text": "y" * 50000},
+            "entities": {"policy_number": "AUTO-001"},
+        },
+        None,
+    )
+
+    assert result["statusCode"] == 200
+    item = claims_table.calls[0]["Item"]
+    assert len(json.loads(item["extracted_data"])["text"]) < 5000
+    ref = json.loads(item["extracted_data_ref"])
+    assert not ref["key"].startswith("claim-context/")
+    (stored,) = [call for call in s3.calls if call["Key"] == ref["key"]]
+    assert stored["Bucket"] == ref["bucket"]
+    assert len(json.loads(stored["Body"])["text"]) == 50000
+
+
+class FakeCacheTable:
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, Key):
+        item = self.items.get(Key["cache_key"])
+        return {"Item": item} if item else {}
+
+    def put_item(self, Item):
+        self.items[Item["cache_key"]] = Item
+
+
+CLAIM_EVENT = {
+    "claim_id": "CLAIM-1",
+    "policy_data": {"found": True, "policy_id": "AUTO-001"},
+    "extracted_data": {"file_type": "pdf", "text": "Rear bumper damage"},
+    "entities": {"policy_number": "AUTO-001"},
+}
+
+
+def run_decision(decision, monkeypatch, model_decision):
+    """Run the handler twice on identical evidence and return both results and the model calls."""
+    prompts = []
+
+    def invoke_claude(prompt):
+        prompts.append(prompt)
+        return dict(model_decision)
+
+    monkeypatch.setattr(decision, "decision_cache_table", FakeCacheTable())
+    monkeypatch.setattr(decision, "invoke_claude", invoke_claude)
+    monkeypatch.setattr(decision, "claims_table", Recorder())
+    monkeypatch.setattr(decision, "s3", Recorder())
+    monkeypatch.setattr(decision, "put_latest_claim", lambda *args: None)
+    monkeypatch.setattr(decision, "new_audit_writer", NullAuditWriter)
+
+    results = [decision.lambda_handler(dict(CLAIM_EVENT), None) for _ in range(2)]
+    return results, prompts
+
+
+def test_identical_evidence_reuses_cached_decision(decision, monkeypatch):
+    (miss, hit), prompts = run_decision(decision, monkeypatch, DECISION)
+
+    assert len(prompts) == 1
+    assert miss["cache_hit"] is False
+    assert hit["cache_hit"] is True
+    assert hit["decision_data"] == miss["decision_data"] == DECISION
+
+
+def test_error_decisions_are_not_cached(decision, monkeypatch):
+    error = {"decision": "ERROR", "reasoning": "Bedrock throttled", "confidence": 0.0}
+    (first, second), prompts = run_decision(decision, monkeypatch, error)
+
+    assert len(prompts) == 2
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is False
+    assert decision.decision_cache_table.items == {}
+
+
+def test_prompt_template_change_changes_cache_key(decision, monkeypatch):
+    sections = decision.build_prompt_sections(CLAIM_EVENT)
+    before = decision.decision_cache_key(sections)
+
+    original = decision.build_decision_prompt
+    monkeypatch.setattr(
+        decision, "build_decision_prompt", lambda *args: original(*args) + "\nBe strict."
+    )
+    decision.prompt_template_hash.cache_clear()
+    try:
+        assert decision.decision_cache_key(sections) != before
+    finally:
+        monkeypatch.undo()
+        decision.prompt_template_hash.cache_clear()
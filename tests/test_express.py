@@ -0,0 +1,13 @@
+"""Tests for the express pipeline function."""
+
+import pytest
+
+
+def test_pipeline_failure_is_raised_for_async_retry(express, monkeypatch):
+    def run_pipeline(event):
+        raise Exception("decision agent failed: throttled")
+
+    monkeypatch.setattr(express, "run_pipeline", run_pipeline)
+
+    with pytest.raises(Exception, match="throttled"):
+        express.lambda_handler({"claim_id": "CLAIM-1", "bucket": "raw", "key": "a.pdf"}, None)
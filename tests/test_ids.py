@@ -0,0 +1,64 @@
+"""Tests for shared.ids."""
+
+import multiprocessing
+import os
+import re
+import threading
+
+import pytest
+
+from shared.ids import ULID_ALPHABET, new_claim_id, new_ulid
+
+IDS_PER_WORKER = 5000
+
+
+def generate_ids(count):
+    return [new_claim_id() for _ in range(count)]
+
+
+def test_claim_id_format():
+    claim_id = new_claim_id()
+
+    assert re.fullmatch(f"CLAIM-[{ULID_ALPHABET}]{{26}}", claim_id)
+
+
+def test_ids_are_unique_and_sorted_within_a_process():
+    ids = [new_ulid() for _ in range(20000)]
+
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_ids_are_unique_across_threads():
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        ids = generate_ids(IDS_PER_WORKER)
+        with lock:
+            results.extend(ids)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == 8 * IDS_PER_WORKER
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_ids_are_unique_across_processes(start_method):
+    if start_method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{start_method} start method not available")
+
+    # Advance this process's sequence so forked children inherit non-zero state
+    new_ulid()
+
+    context = multiprocessing.get_context(start_method)
+    workers = min(8, (os.cpu_count() or 2) * 2)
+    with context.Pool(workers) as pool:
+        batches = pool.map(generate_ids, [IDS_PER_WORKER] * workers)
+
+    ids = [claim_id for batch in batches for claim_id in batch]
+    assert len(set(ids)) == workers * IDS_PER_WORKER
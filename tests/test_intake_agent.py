@@ -0,0 +1,386 @@
+"""Tests for the intake agent."""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pytest
+from moto import mock_aws
+
+
+class FakeTextract:
+    """Serves a finished text-detection job split over a fixed number of result pages."""
+
+    def __init__(self, pages: int, lines_per_page: int = 2):
+        self.pages = pages
+        self.lines_per_page = lines_per_page
+        self.calls = []
+
+    def get_document_text_detection(self, **kwargs):
+        self.calls.append(kwargs)
+        index = int(kwargs.get("NextToken", "0"))
+
+        page = {
+            "JobStatus": "SUCCEEDED",
+            "Blocks": [{"BlockType": "PAGE"}]
+            + [
+                {"BlockType": "LINE", "Text": f"page {index} line {line}"}
+                for line in range(self.lines_per_page)
+            ],
+        }
+        if index + 1 < self.pages:
+            page["NextToken"] = str(index + 1)
+        return page
+
+
+def test_text_detection_reads_every_result_page(intake, monkeypatch):
+    textract = FakeTextract(pages=500)
+    monkeypatch.setattr(intake, "textract", textract)
+
+    result = intake.wait_for_text_detection("job-1")
+
+    lines = result["text"].split("\n")
+    assert len(lines) == 1000
+    assert lines[0] == "page 0 line 0"
+    assert lines[-1] == "page 499 line 1"
+    assert result["job_id"] == "job-1"
+
+    # The first page is fetched once and reused, then one call per NextToken
+    assert len(textract.calls) == 500
+    assert all(call["MaxResults"] == intake.TEXTRACT_PAGE_SIZE for call in textract.calls)
+    assert [call.get("NextToken") for call in textract.calls[1:]] == [str(i) for i in range(1, 500)]
+
+
+def test_text_detection_raises_on_failed_job(intake, monkeypatch):
+    class FailedTextract:
+        def get_document_text_detection(self, **kwargs):
+            return {"JobStatus": "FAILED", "StatusMessage": "bad pdf"}
+
+    monkeypatch.setattr(intake, "textract", FailedTextract())
+
+    with pytest.raises(Exception, match="bad pdf"):
+        intake.wait_for_text_detection("job-2")
+
+
+class StartingTextract:
+    """Records start_document_text_detection calls."""
+
+    def __init__(self):
+        self.started = []
+
+    def start_document_text_detection(self, **kwargs):
+        self.started.append(kwargs)
+        return {"JobId": f"job-{len(self.started)}"}
+
+
+@pytest.fixture
+def sns_completion(intake, monkeypatch):
+    textract = StartingTextract()
+    monkeypatch.setattr(intake, "textract", textract)
+    monkeypatch.setattr(intake, "TEXTRACT_COMPLETION_MODE", "sns")
+    monkeypatch.setattr(intake, "TEXTRACT_SNS_TOPIC_ARN", "arn:aws:sns:us-east-1:1:topic")
+    monkeypatch.setattr(intake, "TEXTRACT_SNS_ROLE_ARN", "arn:aws:iam::1:role/publish")
+    return textract
+
+
+def test_only_task_token_jobs_publish_completion(intake, sns_completion, monkeypatch):
+    monkeypatch.setattr(intake, "save_pending_job", lambda job_id, job: None)
+    monkeypatch.setattr(
+        intake, "wait_for_text_detection", lambda job_id: {"text": "", "job_id": job_id}
+    )
+
+    intake.extract_text_from_pdf("raw", "CLAIM-1/polled.pdf")
+    result = intake.process_object("raw", "CLAIM-1/waiting.pdf", "CLAIM-1", None, "token")
+
+    polled, waiting = sns_completion.started
+    assert result["statusCode"] == 202
+    assert "NotificationChannel" not in polled
+    assert waiting["NotificationChannel"]["SNSTopicArn"] == intake.TEXTRACT_SNS_TOPIC_ARN
+
+
+def test_completion_without_pending_job_is_skipped(intake, monkeypatch):
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=f"{intake.BUCKET_PREFIX}-processed")
+        monkeypatch.setattr(intake, "s3", s3)
+
+        message = {"JobId": "job-unknown", "Status": "SUCCEEDED"}
+        result = intake.textract_completion_handler(
+            {"Records": [{"Sns": {"Message": json.dumps(message)}}]}, None
+        )
+
+    assert result == {"statusCode": 200, "results": []}
+
+
+def s3_record(key):
+    return {"s3": {"bucket": {"name": "raw"}, "object": {"key": key}}}
+
+
+def sqs_record(message_id, key):
+    return {
+        "eventSource": "aws:sqs",
+        "messageId": message_id,
+        "body": json.dumps({"Records": [s3_record(key)]}),
+    }
+
+
+class FakeAuditWriter:
+    def put(self, item):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def stub_processing(intake, monkeypatch):
+    """Stub per-object processing; keys containing "fail" or "textract-error" fail."""
+
+    def process_object(bucket, key, claim_id, audit, task_token=None, pending_artifacts=None):
+        if "fail" in key:
+            raise Exception("boom")
+        result = {"statusCode": 200, "claim_id": claim_id, "bucket": bucket, "key": key}
+        if "textract-error" in key:
+            result["extraction_error"] = "throttled"
+        return result
+
+    monkeypatch.setattr(intake, "process_object", process_object)
+    monkeypatch.setattr(intake, "store_artifacts", lambda artifacts: None)
+    monkeypatch.setattr(intake, "new_audit_writer", FakeAuditWriter)
+
+
+def test_s3_object_keys_are_url_decoded(intake):
+    objects = intake.get_s3_objects(
+        [s3_record("CLAIM-1/front+bumper%281%29.jpg"), sqs_record("m-1", "a%2Fb+c.pdf")]
+    )
+
+    assert [obj["key"] for obj in objects] == ["CLAIM-1/front bumper(1).jpg", "a/b c.pdf"]
+    assert [obj["item_id"] for obj in objects] == [None, "m-1"]
+
+
+def test_sqs_batch_reports_only_failed_messages(intake, stub_processing):
+    result = intake.lambda_handler(
+        {
+            "Records": [
+                sqs_record("ok", "claim/ok.pdf"),
+                sqs_record("bad", "claim/fail.pdf"),
+                sqs_record("retry", "claim/textract-error.pdf"),
+            ]
+        },
+        None,
+    )
+
+    assert result["statusCode"] == 207
+    assert result["batchItemFailures"] == [{"itemIdentifier": "bad"}, {"itemIdentifier": "retry"}]
+
+
+def test_direct_s3_notification_failure_raises_for_retry(intake, stub_processing):
+    assert (
+        intake.lambda_handler({"Records": [s3_record("claim/ok.pdf")]}, None)["statusCode"] == 200
+    )
+
+    with pytest.raises(Exception, match="claim/fail.pdf"):
+        intake.lambda_handler({"Records": [s3_record("claim/fail.pdf")]}, None)
+
+
+def baseline_extract_entities(text):
+    """The original one-search-per-pattern extraction the scanner must agree with."""
+    entities = {"policy_number": None, "incident_date": None}
+
+    policy_match = re.search(r"(AUTO-\d+|POL-\d+|POLICY[:\s]+(\w+-?\d+))", text, re.I)
+    if policy_match:
+        entities["policy_number"] = policy_match.group(1)
+
+    date_match = re.search(r"(\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4})", text)
+    if date_match:
+        entities["incident_date"] = date_match.group(1)
+
+    return entities
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Policy: AUTO-001 incident on 2025-10-22",
+        "policy number x_AUTO-001, loss 10/22/2025",
+        "MYPOL-123 filed 12025-10-22",
+        "Date 2025-10-22 before AUTO-7 and POL-123456",
+        "POLICY AB-123",
+        "auto-42 then pol-7",
+        "nothing to see here",
+        "",
+    ],
+)
+def test_entity_scanner_matches_per_pattern_search(intake, text):
+    entities = intake.extract_entities(text)
+
+    assert {kind: entities[kind] for kind in intake.ENTITY_PATTERNS} == baseline_extract_entities(
+        text
+    )
+    assert entities["claimant_name"] is None
+
+
+def test_entity_scanner_matches_inside_words(intake):
+    assert intake.extract_entities("x_AUTO-001")["policy_number"] == "AUTO-001"
+    assert intake.extract_entities("MYPOL-123")["policy_number"] == "POL-123"
+    assert intake.extract_entities("Policy: AUTO-001")["policy_number"] == "Policy: AUTO-001"
+
+
+class FakeRekognition:
+    """Serves per-image labels and text, tracking how many calls are in flight."""
+
+    def __init__(self, labels, delay=0.0):
+        self.labels = labels
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def call(self, response):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return response
+
+    def detect_labels(self, Image, **kwargs):
+        key = Image["S3Object"]["Name"]
+        if key not in self.labels:
+            raise Exception("InvalidImageFormatException")
+        labels = [{"Name": name, "Confidence": value} for name, value in self.labels[key]]
+        return self.call({"Labels": labels})
+
+    def detect_text(self, Image):
+        key = Image["S3Object"]["Name"]
+        return self.call({"TextDetections": [{"Type": "LINE", "DetectedText": f"text {key}"}]})
+
+
+def test_photo_set_labels_keep_highest_confidence(intake, monkeypatch):
+    rekognition = FakeRekognition(
+        {
+            "front.jpg": [("Car", 91.0), ("Dent", 75.0)],
+            "rear.jpg": [("Car", 97.5), ("Bumper", 88.0)],
+        }
+    )
+    monkeypatch.setattr(intake, "rekognition", rekognition)
+
+    analysis = intake.analyze_images("raw", ["front.jpg", "rear.jpg", "broken.jpg"])
+
+    assert analysis["labels"] == [
+        {"name": "Car", "confidence": 97.5},
+        {"name": "Bumper", "confidence": 88.0},
+        {"name": "Dent", "confidence": 75.0},
+    ]
+    assert analysis["detected_text"] == "text front.jpg text rear.jpg"
+    assert [image["key"] for image in analysis["images"]] == ["front.jpg", "rear.jpg", "broken.jpg"]
+    assert analysis["error"] == "broken.jpg: InvalidImageFormatException"
+
+
+def test_photo_set_calls_are_bounded_by_the_shared_executor(intake, monkeypatch):
+    keys = [f"photo-{i}.jpg" for i in range(10)]
+    rekognition = FakeRekognition({key: [("Car", 90.0)] for key in keys}, delay=0.02)
+    monkeypatch.setattr(intake, "rekognition", rekognition)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        monkeypatch.setattr(intake, "rekognition_executor", executor)
+        analysis = intake.analyze_images("raw", keys)
+
+    assert len(analysis["images"]) == 10
+    assert "error" not in analysis
+    assert 1 < rekognition.max_in_flight <= 3
+
+
+def document(key, file_type, **entities):
+    return {"key": key, "file_type": file_type, "entities": entities}
+
+
+def test_pdf_entities_win_over_photo_majority(intake):
+    entities, conflicts = intake.merge_entities(
+        [
+            document("a.jpg", "image", policy_number="AUTO-999"),
+            document("b.jpg", "image", policy_number="AUTO-999"),
+            document("c.pdf", "pdf", policy_number="AUTO-001"),
+        ]
+    )
+
+    assert entities["policy_number"] == "AUTO-001"
+    assert conflicts["policy_number"] == [
+        {"value": "AUTO-001", "sources": ["c.pdf"]},
+        {"value": "AUTO-999", "sources": ["a.jpg", "b.jpg"]},
+    ]
+
+
+def test_most_common_entity_wins_among_equal_sources(intake):
+    entities, conflicts = intake.merge_entities(
+        [
+            document("a.pdf", "pdf", incident_date="2025-10-21"),
+            document("b.pdf", "pdf", incident_date="2025-10-22"),
+            document("c.pdf", "pdf", incident_date="2025-10-22"),
+        ]
+    )
+
+    assert entities["incident_date"] == "2025-10-22"
+    assert [c["value"] for c in conflicts["incident_date"]] == ["2025-10-22", "2025-10-21"]
+
+
+def test_first_found_entity_breaks_ties_and_case_is_ignored(intake):
+    entities, conflicts = intake.merge_entities(
+        [
+            document("a.pdf", "pdf", policy_number="auto-001", incident_date=None),
+            document("b.pdf", "pdf", policy_number="AUTO-002"),
+            document("c.pdf", "pdf", policy_number="AUTO-001"),
+            document("d.pdf", "pdf", policy_number="AUTO-002"),
+        ]
+    )
+
+    assert entities["policy_number"] == "auto-001"
+    assert conflicts["policy_number"][0]["sources"] == ["a.pdf", "c.pdf"]
+    assert entities["incident_date"] is None
+    assert "incident_date" not in conflicts
+
+
+def test_claim_prefix_combines_documents_into_one_extraction(intake, monkeypatch):
+    keys = ["CLAIM-1/estimate.pdf", "CLAIM-1/front.jpg", "CLAIM-1/notes.txt", "CLAIM-1/rear.jpg"]
+    texts = {"CLAIM-1/estimate.pdf": "Policy AUTO-001, incident on 2025-10-22"}
+    rekognition = FakeRekognition(
+        {"CLAIM-1/front.jpg": [("Car", 90.0)], "CLAIM-1/rear.jpg": [("Car", 95.0), ("Dent", 80.0)]}
+    )
+    recorded, stored = {}, []
+
+    def record_intake(claim_id, bucket, key, extracted_data, entities, audit):
+        recorded.update(key=key, extracted_data=extracted_data, entities=entities)
+        return {"statusCode": 200, "claim_id": claim_id}
+
+    monkeypatch.setattr(intake, "list_claim_objects", lambda bucket, prefix: keys)
+    monkeypatch.setattr(
+        intake, "extract_text_from_pdf", lambda bucket, key: {"text": texts[key], "job_id": "j"}
+    )
+    monkeypatch.setattr(intake, "rekognition", rekognition)
+    monkeypatch.setattr(intake, "store_artifacts", stored.extend)
+    monkeypatch.setattr(intake, "build_artifact", lambda claim_id, bucket, key, *args: key)
+    monkeypatch.setattr(intake, "record_intake", record_intake)
+
+    result = intake.process_claim_prefix("raw", "CLAIM-1/", "CLAIM-1", None)
+
+    assert result["statusCode"] == 200
+    extracted = recorded["extracted_data"]
+    assert recorded["key"] == "CLAIM-1/"
+    assert extracted["file_type"] == "claim"
+    assert extracted["text"] == f"[CLAIM-1/estimate.pdf]\n{texts['CLAIM-1/estimate.pdf']}"
+    assert extracted["labels"] == [
+        {"name": "Car", "confidence": 95.0},
+        {"name": "Dent", "confidence": 80.0},
+    ]
+    assert extracted["detected_text"] == "text CLAIM-1/front.jpg text CLAIM-1/rear.jpg"
+    assert [doc["key"] for doc in extracted["documents"]] == keys
+    assert extracted["error"] == "CLAIM-1/notes.txt: Unsupported file type"
+    assert recorded["entities"]["incident_date"] == "2025-10-22"
+    assert stored == keys
@@ -0,0 +1,44 @@
+"""Tests for the policy agent."""
+
+
+def test_cached_policy_is_returned_as_a_copy(policy, monkeypatch):
+    lookups = []
+
+    def query_weaviate_policy(policy_number):
+        lookups.append(policy_number)
+        return {"found": True, "policy_number": policy_number, "coverage": {"collision": 500}}
+
+    monkeypatch.setattr(policy, "query_weaviate_policy", query_weaviate_policy)
+    monkeypatch.setattr(policy, "get_shared_cached_policy", lambda key: None)
+    monkeypatch.setattr(policy, "put_shared_cached_policy", lambda key, data: None)
+    policy.policy_cache.clear()
+
+    first = policy.query_policy("AUTO-001")
+    first["coverage"]["collision"] = 0
+    first["found"] = False
+
+    second = policy.query_policy("AUTO-001")
+
+    assert lookups == ["AUTO-001"]
+    assert second["found"] is True
+    assert second["coverage"] == {"collision": 500}
+
+
+def test_labelled_policy_numbers_share_the_exact_lookup_key(policy, monkeypatch):
+    lookups = []
+
+    def query_weaviate_policy(policy_number):
+        lookups.append(policy.normalize_policy_number(policy_number))
+        return {"found": True, "policy_id": "AUTO-001"}
+
+    monkeypatch.setattr(policy, "query_weaviate_policy", query_weaviate_policy)
+    monkeypatch.setattr(policy, "get_shared_cached_policy", lambda key: None)
+    monkeypatch.setattr(policy, "put_shared_cached_policy", lambda key, data: None)
+    policy.policy_cache.clear()
+
+    policy.query_policy("Policy: AUTO-001")
+    policy.query_policy("auto-001")
+    policy.query_policy("POLICY #AUTO-001")
+
+    assert lookups == ["AUTO-001"]
+    assert policy.normalize_policy_number("POL-123456") == "POL-123456"
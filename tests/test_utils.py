@@ -0,0 +1,134 @@
+"""Tests for shared.utils."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from shared import utils
+
+
+class FakeSecretsManager:
+    """Returns an incrementing version of the secret on every call."""
+
+    def __init__(self, block: threading.Event = None):
+        self.calls = 0
+        self.block = block
+        self.lock = threading.Lock()
+
+    def get_secret_value(self, SecretId):
+        with self.lock:
+            self.calls += 1
+            version = self.calls
+        if self.block is not None:
+            self.block.wait(timeout=5)
+        return {"SecretString": json.dumps({"name": SecretId, "version": version})}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(utils.time, "monotonic", clock)
+    utils._secret_cache.clear()
+    utils._secret_refreshing.clear()
+    yield clock
+    utils._secret_cache.clear()
+    utils._secret_refreshing.clear()
+
+
+def wait_for_refresh(secret_name):
+    for _ in range(500):
+        with utils._secret_lock:
+            if secret_name not in utils._secret_refreshing:
+                return
+        time.sleep(0.01)
+    raise AssertionError("background refresh did not finish")
+
+
+def test_secret_is_cached_until_expiry(clock):
+    client = FakeSecretsManager()
+
+    assert utils.get_secret("s", client, ttl=100)["version"] == 1
+    clock.now += 50
+    assert utils.get_secret("s", client, ttl=100)["version"] == 1
+    assert client.calls == 1
+
+    clock.now += 60
+    assert utils.get_secret("s", client, ttl=100)["version"] == 2
+    assert client.calls == 2
+
+
+def test_force_refresh_and_invalidate_bypass_cache(clock):
+    client = FakeSecretsManager()
+    utils.get_secret("s", client)
+
+    assert utils.get_secret("s", client, force_refresh=True)["version"] == 2
+
+    utils.invalidate_secret("s")
+    assert utils.get_secret("s", client)["version"] == 3
+
+
+def test_refresh_ahead_serves_cached_value_and_refreshes_in_background(clock):
+    client = FakeSecretsManager()
+    utils.get_secret("s", client, ttl=100)
+
+    # Past the refresh-ahead point but inside the TTL: old value, refresh started
+    clock.now += 85
+    assert utils.get_secret("s", client, ttl=100)["version"] == 1
+    wait_for_refresh("s")
+    assert client.calls == 2
+
+    # The refreshed value restarts the TTL
+    clock.now += 50
+    assert utils.get_secret("s", client, ttl=100)["version"] == 2
+    assert client.calls == 2
+
+
+def test_concurrent_callers_start_a_single_refresh(clock):
+    release = threading.Event()
+    client = FakeSecretsManager()
+    utils.get_secret("s", client, ttl=100)
+    client.block = release
+
+    clock.now += 90
+    results = []
+
+    def read():
+        results.append(utils.get_secret("s", client, ttl=100)["version"])
+
+    threads = [threading.Thread(target=read) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    # Every caller got the cached value without waiting on the in-flight refresh
+    assert results == [1] * 20
+
+    release.set()
+    wait_for_refresh("s")
+    assert client.calls == 2
+
+
+def test_failed_refresh_keeps_cached_value(clock):
+    client = FakeSecretsManager()
+    utils.get_secret("s", client, ttl=100)
+
+    def fail(SecretId):
+        raise Exception("throttled")
+
+    client.get_secret_value = fail
+    clock.now += 85
+    assert utils.get_secret("s", client, ttl=100)["version"] == 1
+    wait_for_refresh("s")
+
+    assert utils.get_secret("s", client, ttl=100)["version"] == 1
@@ -0,0 +1,304 @@
+"""Consistency checks for the Step Functions workflow definition."""
+
+import json
+import os
+import re
+
+import pytest
+
+WORKFLOW_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "infrastructure",
+    "stepfunctions-workflow.json",
+)
+
+# Fields each assessment agent returns to the workflow
+AGENT_FIELDS = {
+    "claimvoyant-policy": {"policy_number", "policy_found"},
+    "claimvoyant-damage": {"damage_assessment"},
+    "claimvoyant-valuation": {"valuation"},
+}
+
+
+@pytest.fixture(scope="module")
+def workflow():
+    with open(WORKFLOW_PATH) as f:
+        return json.load(f)
+
+
+def branch_outputs(branch):
+    """Return the Lambda function a branch invokes and the fields its final state selects."""
+    state = branch["States"][branch["StartAt"]]
+    assert state.get("End"), "assessment branches are expected to be a single task"
+
+    fields = {name[: -len(".$")] for name in state.get("ResultSelector", {})}
+    return state["Parameters"]["FunctionName"], fields
+
+
+def test_merge_results_reads_each_field_from_the_branch_that_produces_it(workflow):
+    states = workflow["States"]
+    branches = [branch_outputs(branch) for branch in states["ParallelAssessment"]["Branches"]]
+    merge = states["MergeResults"]["Parameters"]
+
+    result_path = states["ParallelAssessment"]["ResultPath"].removeprefix("$.")
+    referenced = 0
+    for name, path in merge.items():
+        match = re.fullmatch(rf"\$\.{result_path}\[(\d+)\]\.(\w+)", path)
+        if not match:
+            continue
+
+        index, field = int(match.group(1)), match.group(2)
+        function_name, fields = branches[index]
+        assert field in fields, f"{name} reads {field} from branch {index} ({function_name})"
+        assert field in AGENT_FIELDS[function_name]
+        referenced += 1
+
+    # Every assessment output reaches the decision
+    assert referenced == sum(len(fields) for fields in AGENT_FIELDS.values())
+
+
+def test_assessment_branches_cover_every_agent_once(workflow):
+    branches = workflow["States"]["ParallelAssessment"]["Branches"]
+    function_names = [branch_outputs(branch)[0] for branch in branches]
+
+    assert sorted(function_names) == sorted(AGENT_FIELDS)
+
+
+def test_every_transition_targets_an_existing_state(workflow):
+    def check(states):
+        for state in states.values():
+            targets = [state.get("Next")] + [c["Next"] for c in state.get("Catch", [])]
+            for target in filter(None, targets):
+                assert target in states
+            for branch in state.get("Branches", []):
+                assert branch["StartAt"] in branch["States"]
+                check(branch["States"])
+
+    assert workflow["StartAt"] in workflow["States"]
+    check(workflow["States"])
+
+
+def test_optional_input_fields_are_defaulted_before_intake(workflow):
+    states = workflow["States"]
+    normalize = states[workflow["StartAt"]]
+    assert normalize["Type"] == "Pass"
+
+    # Undo the intrinsic-string escaping of the literal merged under the execution input
+    merge = normalize["Parameters"]["input.$"]
+    literal = re.search(r"States\.StringToJson\('(.*?)'\)", merge).group(1)
+    defaults = json.loads(re.sub(r"\\(.)", r"\1", literal))
+    assert re.fullmatch(r"States\.JsonMerge\(.*, \$, false\)", merge)
+
+    # The API starts executions with claim_id, bucket and one of key or prefix
+    intake = states[normalize["Next"]]
+    paths = {
+        path.removeprefix("$.")
+        for name, path in intake["Parameters"]["Payload"].items()
+        if name.endswith(".$") and path.startswith("$.")
+    }
+    assert paths - {"claim_id", "bucket"} == {"key", "prefix"}
+    assert defaults == {"key": None, "prefix": None}
+
+
+class StatesError(Exception):
+    def __init__(self, error, cause=""):
+        super().__init__(f"{error}: {cause}")
+        self.error = error
+
+
+class WorkflowSimulator:
+    """
+    Interpreter for the subset of ASL the workflow uses (Pass, Task, Parallel, Succeed,
+    Fail), with Lambda tasks served by Python functions.
+
+    Each function also has a simulated latency; elapsed is the execution's critical
+    path, with Parallel branches overlapping.
+    """
+
+    def __init__(self, functions, latencies):
+        self.functions = functions
+        self.latencies = latencies
+        self.calls = []
+
+    def run(self, definition, document):
+        state_name = definition["StartAt"]
+        elapsed = 0.0
+        while True:
+            state = definition["States"][state_name]
+            try:
+                document, duration = self.run_state(state, document)
+            except StatesError as e:
+                catcher = next(
+                    (c for c in state.get("Catch", []) if "States.ALL" in c["ErrorEquals"]), None
+                )
+                if catcher is None:
+                    raise
+                document = self.apply_result_path(
+                    document, catcher.get("ResultPath", "$"), {"Error": e.error}
+                )
+                state_name = catcher["Next"]
+                continue
+
+            elapsed += duration
+            if state["Type"] == "Succeed" or state.get("End"):
+                return document, elapsed
+            if state["Type"] == "Fail":
+                raise StatesError(state["Error"], state.get("Cause", ""))
+            state_name = state["Next"]
+
+    def run_state(self, state, document):
+        if state["Type"] in ("Succeed", "Fail"):
+            return document, 0.0
+
+        effective = self.resolve(document, state.get("InputPath", "$"))
+        if state["Type"] == "Parallel":
+            outputs = [self.run(branch, effective) for branch in state["Branches"]]
+            result = [output for output, _ in outputs]
+            duration = max(elapsed for _, elapsed in outputs)
+        else:
+            if "Parameters" in state:
+                effective = self.render(state["Parameters"], effective)
+            result, duration = effective, 0.0
+            if state["Type"] == "Task":
+                result, duration = self.invoke(state["Resource"], effective)
+
+        if "ResultSelector" in state:
+            result = self.render(state["ResultSelector"], result)
+        document = self.apply_result_path(document, state.get("ResultPath", "$"), result)
+        return self.resolve(document, state.get("OutputPath", "$")), duration
+
+    def invoke(self, resource, parameters):
+        name = parameters["FunctionName"]
+        self.calls.append(name)
+        payload = self.functions[name](json.loads(json.dumps(parameters["Payload"])))
+
+        # Callback tasks resume with the output passed to SendTaskSuccess
+        if resource.endswith(".waitForTaskToken"):
+            return payload, self.latencies[name]
+        return {"StatusCode": 200, "Payload": payload}, self.latencies[name]
+
+    def render(self, template, document):
+        if isinstance(template, dict):
+            rendered = {}
+            for name, value in template.items():
+                if name.endswith(".$"):
+                    rendered[name[:-2]] = self.evaluate(value, document)
+                else:
+                    rendered[name] = self.render(value, document)
+            return rendered
+        return template
+
+    def evaluate(self, expression, document):
+        if expression == "$$.Task.Token":
+            return "task-token"
+
+        merge = re.fullmatch(
+            r"States\.JsonMerge\(States\.StringToJson\('(.*)'\), \$, false\)", expression
+        )
+        if merge:
+            defaults = json.loads(re.sub(r"\\(.)", r"\1", merge.group(1)))
+            return {**defaults, **document}
+
+        return self.resolve(document, expression)
+
+    @staticmethod
+    def resolve(document, path):
+        value = document
+        for name, index in re.findall(r"\.(\w+)|\[(\d+)\]", path.removeprefix("$")):
+            try:
+                value = value[name] if name else value[int(index)]
+            except (KeyError, IndexError, TypeError):
+                raise StatesError("States.Runtime", f"{path} not found in input")
+        return value
+
+    @staticmethod
+    def apply_result_path(document, path, result):
+        if path == "$":
+            return result
+        updated = dict(document)
+        updated[path.removeprefix("$.")] = result
+        return updated
+
+
+def agent_functions():
+    """Fake agents returning the fields each one contributes to the workflow."""
+    context_ref = {"bucket": "processed", "prefix": "claim-context/CLAIM-1/run/"}
+
+    def intake(event):
+        assert event["task_token"] == "task-token"
+        key = event["key"] or event["prefix"]
+        return {**event, "statusCode": 200, "key": key, "context_ref": context_ref}
+
+    def assessment(fields):
+        def agent(event):
+            assert event["context_ref"] == context_ref
+            return {"statusCode": 200, "claim_id": event["claim_id"], **fields}
+
+        return agent
+
+    def decision(event):
+        return {
+            "statusCode": 200,
+            "claim_id": event["claim_id"],
+            "version": "v1",
+            "decision": "APPROVE",
+            "decision_data": {"inputs": event},
+            "cache_hit": False,
+            "report_s3_key": "CLAIM-1/final_decision.json",
+        }
+
+    return {
+        "claimvoyant-intake": intake,
+        "claimvoyant-policy": assessment({"policy_number": "AUTO-001", "policy_found": True}),
+        "claimvoyant-damage": assessment({"damage_assessment": {"severity": "moderate"}}),
+        "claimvoyant-valuation": assessment({"valuation": {"estimated_value": 18000}}),
+        "claimvoyant-decision": decision,
+    }
+
+
+LATENCIES = {
+    "claimvoyant-intake": 4.0,
+    "claimvoyant-policy": 1.5,
+    "claimvoyant-damage": 2.0,
+    "claimvoyant-valuation": 0.5,
+    "claimvoyant-decision": 3.0,
+}
+
+
+@pytest.mark.parametrize(
+    "execution_input",
+    [
+        {"claim_id": "CLAIM-1", "bucket": "raw", "key": "CLAIM-1/estimate.pdf"},
+        {"claim_id": "CLAIM-1", "bucket": "raw", "prefix": "CLAIM-1/"},
+    ],
+)
+def test_policy_runs_off_the_critical_path(workflow, execution_input):
+    simulator = WorkflowSimulator(agent_functions(), LATENCIES)
+
+    output, elapsed = simulator.run(workflow, execution_input)
+
+    assert output["decision"] == "APPROVE"
+    decision_input = output["decision_data"]["inputs"]
+    assert decision_input["policy_number"] == "AUTO-001"
+    assert decision_input["policy_found"] is True
+    assert decision_input["damage_assessment"] == {"severity": "moderate"}
+    assert decision_input["valuation"] == {"estimated_value": 18000}
+
+    # Intake, the slowest assessment branch, then the decision; policy adds no hop
+    assert elapsed == LATENCIES["claimvoyant-intake"] + 2.0 + LATENCIES["claimvoyant-decision"]
+    assert simulator.calls[0] == "claimvoyant-intake"
+    assert simulator.calls[-1] == "claimvoyant-decision"
+
+
+def test_failed_assessment_branch_fails_the_execution(workflow):
+    functions = agent_functions()
+
+    def damage(event):
+        raise StatesError("Lambda.Unknown", "damage agent crashed")
+
+    functions["claimvoyant-damage"] = damage
+
+    with pytest.raises(StatesError, match="ClaimProcessingFailed"):
+        WorkflowSimulator(functions, LATENCIES).run(
+            workflow, {"claim_id": "CLAIM-1", "bucket": "raw", "key": "CLAIM-1/estimate.pdf"}
+        )